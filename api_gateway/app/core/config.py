@@ -10,6 +10,65 @@ class Settings(BaseSettings):
     USER_SERVICE_URL: str
     TASK_SERVICE_URL: str
 
+    # upstream connection pools (one long-lived client per service)
+    AUTH_SERVICE_MAX_CONNECTIONS: int = 100
+    AUTH_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AUTH_SERVICE_KEEPALIVE_EXPIRY: float = 30.0
+    AUTH_SERVICE_CONNECT_TIMEOUT: float = 2.0
+    AUTH_SERVICE_READ_TIMEOUT: float = 5.0
+    AUTH_SERVICE_HTTP2: bool = False
+
+    TASK_SERVICE_MAX_CONNECTIONS: int = 200
+    TASK_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    TASK_SERVICE_KEEPALIVE_EXPIRY: float = 30.0
+    TASK_SERVICE_CONNECT_TIMEOUT: float = 2.0
+    TASK_SERVICE_READ_TIMEOUT: float = 5.0
+    TASK_SERVICE_HTTP2: bool = False
+
+    # GET /tasks/stream gets its own pool so long-lived SSE connections never
+    # starve regular task traffic; reads have no timeout (heartbeats keep it alive)
+    TASK_STREAM_MAX_CONNECTIONS: int = 1000
+    TASK_STREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+
+    USER_SERVICE_MAX_CONNECTIONS: int = 100
+    USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    USER_SERVICE_KEEPALIVE_EXPIRY: float = 30.0
+    USER_SERVICE_CONNECT_TIMEOUT: float = 2.0
+    USER_SERVICE_READ_TIMEOUT: float = 5.0
+    USER_SERVICE_HTTP2: bool = False
+
+    # local token verification (same key material as auth_service)
+    JWT_SECRET_KEY: str | None = None
+    JWT_ALGORITHM: str = "HS256"
+    # when set, tokens are verified against the auth service JWKS instead, each
+    # with its JWK's own `alg`, which must be one of JWKS_ALLOWED_ALGORITHMS
+    JWKS_URL: str | None = None
+    JWKS_ALLOWED_ALGORITHMS: list[str] = ["RS256", "ES256"]
+    JWKS_REFRESH_SECONDS: int = 300
+    JWKS_MIN_REFRESH_SECONDS: int = 30
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    # logouts published by auth_service; the token cache is only used while subscribed
+    TOKEN_INVALIDATION_CHANNEL: str = "auth:token:invalidate"
+    TOKEN_REVOCATION_MAX_ENTRIES: int = 100000
+
+    # redis (REDIS_UNIX_SOCKET_PATH takes precedence over host/port)
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str | None = None
+    REDIS_UNIX_SOCKET_PATH: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 0.5
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    # signed identity header forwarded to task/user services
+    INTERNAL_IDENTITY_SECRET: str | None = None
+    INTERNAL_IDENTITY_HEADER: str = "X-Internal-Identity"
+    INTERNAL_IDENTITY_TTL_SECONDS: int = 60
+
     class Config:
         env_file = BASE_DIR / ".env"
 
@@ -0,0 +1,97 @@
+import httpx
+
+from app.core.config import settings
+
+
+def _build_client(
+    *,
+    base_url: str,
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    connect_timeout: float,
+    read_timeout: float | None,
+    http2: bool,
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            read_timeout,
+            connect=connect_timeout,
+            # waiting for a free connection is bounded by the connect budget
+            pool=connect_timeout,
+        ),
+        http2=http2,
+    )
+
+
+class UpstreamClients:
+    '''
+    Registry of keep-alive clients, one per upstream service.
+    Opened and closed by the application lifespan in `app.main`.
+    '''
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def start(self):
+        if self._clients:
+            return
+
+        self._clients = {
+            "auth": _build_client(
+                base_url=settings.AUTH_SERVICE_URL,
+                max_connections=settings.AUTH_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AUTH_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AUTH_SERVICE_KEEPALIVE_EXPIRY,
+                connect_timeout=settings.AUTH_SERVICE_CONNECT_TIMEOUT,
+                read_timeout=settings.AUTH_SERVICE_READ_TIMEOUT,
+                http2=settings.AUTH_SERVICE_HTTP2,
+            ),
+            "task": _build_client(
+                base_url=settings.TASK_SERVICE_URL,
+                max_connections=settings.TASK_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TASK_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.TASK_SERVICE_KEEPALIVE_EXPIRY,
+                connect_timeout=settings.TASK_SERVICE_CONNECT_TIMEOUT,
+                read_timeout=settings.TASK_SERVICE_READ_TIMEOUT,
+                http2=settings.TASK_SERVICE_HTTP2,
+            ),
+            "task_stream": _build_client(
+                base_url=settings.TASK_SERVICE_URL,
+                max_connections=settings.TASK_STREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TASK_STREAM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.TASK_SERVICE_KEEPALIVE_EXPIRY,
+                connect_timeout=settings.TASK_SERVICE_CONNECT_TIMEOUT,
+                read_timeout=None,
+                http2=settings.TASK_SERVICE_HTTP2,
+            ),
+            "user": _build_client(
+                base_url=settings.USER_SERVICE_URL,
+                max_connections=settings.USER_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.USER_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.USER_SERVICE_KEEPALIVE_EXPIRY,
+                connect_timeout=settings.USER_SERVICE_CONNECT_TIMEOUT,
+                read_timeout=settings.USER_SERVICE_READ_TIMEOUT,
+                http2=settings.USER_SERVICE_HTTP2,
+            ),
+        }
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        try:
+            return self._clients[name]
+        except KeyError:
+            raise RuntimeError(f"Upstream client '{name}' is not started")
+
+
+upstream_clients = UpstreamClients()
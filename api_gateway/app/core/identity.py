@@ -0,0 +1,35 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from app.core.config import settings
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def token_fingerprint(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def sign_identity(claims: dict, token: str, token_exp: int) -> str:
+    '''
+    Build the internal identity header value: `<payload>.<signature>`.
+    The payload is bound to the bearer token it was derived from and expires
+    with it (or after INTERNAL_IDENTITY_TTL_SECONDS, whichever comes first).
+    '''
+    envelope = {
+        **claims,
+        "tkn": token_fingerprint(token),
+        "exp": min(token_exp, int(time.time()) + settings.INTERNAL_IDENTITY_TTL_SECONDS),
+    }
+    payload = _b64encode(json.dumps(envelope, separators=(",", ":")).encode())
+    signature = hmac.new(
+        settings.INTERNAL_IDENTITY_SECRET.encode(),
+        payload.encode(),
+        hashlib.sha256,
+    ).digest()
+    return f"{payload}.{_b64encode(signature)}"
@@ -0,0 +1,111 @@
+import httpx
+from fastapi import Request, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.core.config import settings
+from app.core.http_client import upstream_clients
+from app.core.identity import sign_identity
+from app.core.security import verify_access_token
+
+# Headers that only describe a single connection and must not be forwarded
+# (RFC 9110 section 7.6.1). `host` is rewritten by httpx for the upstream.
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+})
+
+
+def filter_headers(items: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    # any header listed in `Connection` is hop-by-hop as well
+    connection_tokens = {
+        token.strip().lower()
+        for key, value in items
+        if key.lower() == "connection"
+        for token in value.split(",")
+        if token.strip()
+    }
+    return [
+        (key, value)
+        for key, value in items
+        if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in connection_tokens
+    ]
+
+
+async def identity_headers(request: Request, *, inject_identity: bool) -> list[tuple[str, str]]:
+    identity_header = settings.INTERNAL_IDENTITY_HEADER.lower()
+
+    # never let a client supply its own identity header
+    headers = [(key, value) for key, value in filter_headers(request.headers.items()) if key.lower() != identity_header]
+
+    if not inject_identity or not settings.INTERNAL_IDENTITY_SECRET:
+        return headers
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return headers
+
+    verified = await verify_access_token(token)
+    if verified is None:
+        # let the service reject it through its usual validation path
+        return headers
+
+    claims, exp = verified
+    headers.append((settings.INTERNAL_IDENTITY_HEADER, sign_identity(claims, token, exp)))
+    return headers
+
+
+async def proxy_request(
+    request: Request,
+    *,
+    service: str,
+    path: str,
+    unavailable_detail: str,
+    inject_identity: bool = False,
+):
+    '''
+    Forward `request` to the `service` upstream without buffering either body.
+    The client body is piped upstream as it arrives and the upstream response is
+    streamed back byte for byte (content-encoding untouched).
+
+    With `inject_identity` the bearer token is verified locally and a signed
+    identity header is attached so the service can skip token validation.
+    '''
+    client = upstream_clients.get(service)
+
+    # only attach a body stream when the client actually sent one
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+
+    upstream_request = client.build_request(
+        method = request.method,
+        url = path,
+        headers = await identity_headers(request, inject_identity = inject_identity),
+        content = request.stream() if has_body else None,
+        params = request.query_params,
+    )
+
+    try:
+        upstream_response = await client.send(upstream_request, stream = True)
+    except httpx.RequestError:
+        raise HTTPException(status_code = status.HTTP_503_SERVICE_UNAVAILABLE, detail = unavailable_detail)
+
+    response = StreamingResponse(
+        upstream_response.aiter_raw(),
+        status_code = upstream_response.status_code,
+        background = BackgroundTask(upstream_response.aclose),
+    )
+    # keep repeated headers such as set-cookie intact
+    response.raw_headers = [
+        (key.lower().encode("latin-1"), value.encode("latin-1"))
+        for key, value in filter_headers(upstream_response.headers.multi_items())
+    ]
+    return response
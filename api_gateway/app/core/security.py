@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from jose import jwt, JWTError
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.jwks import jwks_cache
+from app.core.token_cache import get_verified, set_verified, is_revoked
+
+
+class IdentityClaims(BaseModel):
+    # mirrors TokenValidationResponse returned by /auth/validate-token
+    auth_user_id: int
+    email: str
+    is_active: bool = True
+    created_at: datetime
+
+
+async def decode_token(token: str) -> dict:
+    # same checks as auth_service.app.core.security.decode_token
+    if jwks_cache.enabled:
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = await jwks_cache.get_key(kid) if kid else None
+        if public_key is None:
+            raise JWTError("Unknown signing key")
+        # the key decides the algorithm (allow-listed when the JWKS was loaded)
+        return jwt.decode(
+            token,
+            public_key,
+            algorithms=[public_key["alg"]]
+        )
+
+    return jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM]
+    )
+
+
+async def verify_access_token(token: str) -> tuple[dict, int] | None:
+    '''
+    Verify `token` locally and return `(claims, exp)` in the shape the services
+    expect from /auth/validate-token, or None when the token can not be trusted.
+    '''
+    if not jwks_cache.enabled and not settings.JWT_SECRET_KEY:
+        return None
+
+    # logged out: the service rejects it through its usual validation path
+    if is_revoked(token):
+        return None
+
+    cached = get_verified(token)
+    if cached is not None:
+        return cached
+
+    try:
+        payload = await decode_token(token)
+        claims = IdentityClaims(
+            auth_user_id=int(payload["sub"]),
+            email=payload["email"],
+            is_active=bool(payload["is_active"]),
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        ).model_dump(mode="json")
+        exp = int(payload["exp"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+    set_verified(token, claims, exp)
+    return claims, exp
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+import time
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.identity import token_fingerprint
+from app.core.redis import redis_client, redis_pubsub_client
+
+logger = logging.getLogger(__name__)
+
+# written by auth_service on logout: token fingerprint -> `exp`
+REVOKED_TOKENS_KEY = "auth:token:revoked"
+
+# verified `(claims, exp)` keyed by token fingerprint, bounded and never outliving `exp`
+verified_tokens = TTLCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    default_ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+# logged-out tokens until they expire; filled from REVOKED_TOKENS_KEY on every
+# (re)subscribe and kept current by invalidation messages
+revoked_tokens = TTLCache(
+    max_entries=settings.TOKEN_REVOCATION_MAX_ENTRIES,
+    default_ttl=float("inf"),
+)
+
+
+def get_verified(token: str) -> tuple[dict, int] | None:
+    if not token_invalidation_listener.subscribed:
+        return None
+    return verified_tokens.get(token_fingerprint(token))
+
+
+def set_verified(token: str, claims: dict, exp: int):
+    if not token_invalidation_listener.subscribed or is_revoked(token):
+        return
+    verified_tokens.set(token_fingerprint(token), (claims, exp), ttl=exp - time.time())
+
+
+def is_revoked(token: str) -> bool:
+    return revoked_tokens.get(token_fingerprint(token)) is not None
+
+
+def apply_invalidation(message: dict):
+    fingerprint = message.get("token")
+    if not fingerprint:
+        return
+    verified_tokens.delete(fingerprint)
+
+    revoked_until = message.get("revoked_until")
+    if revoked_until is not None:
+        revoked_tokens.set(fingerprint, True, ttl=float(revoked_until) - time.time())
+
+
+async def load_revoked_tokens():
+    now = time.time()
+    for fingerprint, exp in await redis_client.zrangebyscore(REVOKED_TOKENS_KEY, now, "+inf", withscores=True):
+        revoked_tokens.set(fingerprint.decode(), True, ttl=exp - now)
+
+
+class TokenInvalidationListener:
+    '''
+    Same subscription as in task_service / user_service: applies auth_service's
+    logout messages to `verified_tokens`, which is only used while subscribed.
+    Anything cached before a disconnect may have missed a message, so it is
+    dropped and the revocation list reloaded.
+    '''
+
+    def __init__(self):
+        self.subscribed = False
+        self._task: asyncio.Task | None = None
+
+    async def _listen(self):
+        backoff = 1
+        while True:
+            pubsub = redis_pubsub_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.TOKEN_INVALIDATION_CHANNEL)
+                verified_tokens.clear()
+                # after subscribing, so a logout in between is not missed
+                await load_revoked_tokens()
+                self.subscribed = True
+                backoff = 1
+
+                async for message in pubsub.listen():
+                    try:
+                        apply_invalidation(json.loads(message["data"]))
+                    except (ValueError, TypeError, AttributeError):
+                        logger.warning("Ignoring malformed token invalidation message: %r", message)
+            except (ConnectionError, ConnectionRefusedError, TimeoutError, OSError):
+                # without invalidations the cache can not be trusted
+                self.subscribed = False
+                verified_tokens.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                self.subscribed = False
+                await pubsub.aclose()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+token_invalidation_listener = TokenInvalidationListener()
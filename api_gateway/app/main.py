@@ -1,10 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from app.core.config import settings
+from app.core.http_client import upstream_clients
+from app.core.jwks import jwks_cache
+from app.core.token_cache import token_invalidation_listener
 from app.routers import auth, task, user
 
-app = FastAPI(title=settings.APP_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one pooled keep-alive client per upstream for the whole process
+    upstream_clients.start()
+    await jwks_cache.start()
+    token_invalidation_listener.start()
+    try:
+        yield
+    finally:
+        await token_invalidation_listener.stop()
+        await jwks_cache.stop()
+        await upstream_clients.close()
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.include_router(auth.router)
 app.include_router(task.router)
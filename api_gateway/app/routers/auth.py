@@ -1,7 +1,6 @@
-import httpx
-from fastapi import APIRouter, Request, HTTPException, status, Response
+from fastapi import APIRouter, Request
 
-from app.core.config import settings
+from app.core.proxy import proxy_request
 
 router = APIRouter(prefix = "/auth", tags = ["Authentication"])
 
@@ -23,30 +22,4 @@ router = APIRouter(prefix = "/auth", tags = ["Authentication"])
 
 @router.api_route("/{path:path}", methods = ["POST"])
 async def auth_proxy(path: str, request: Request):
-    
-    # Read body once
-    body = await request.body()
-    
-    # Remove host header (very important for proxies)
-    headers = dict[str, str](request.headers)
-    headers.pop("host", None)
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.request(
-                method = request.method,
-                url = f"{settings.AUTH_SERVICE_URL}/auth/{path}",
-                headers = headers,
-                content = body,
-                params = request.query_params,
-                timeout = 5
-            )
-        except httpx.RequestError as e: 
-            raise HTTPException(status_code= status.HTTP_503_SERVICE_UNAVAILABLE, detail = "Auth Service Unavailable")
-        
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers=dict(response.headers),
-            media_type=response.headers.get("content-type"),
-        )
+    return await proxy_request(request, service = "auth", path = f"/auth/{path}", unavailable_detail = "Auth Service Unavailable")
@@ -9,10 +9,34 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
 
-    JWT_SECRET_KEY: str
+    # HS256 signs with JWT_SECRET_KEY; RS256/ES256 sign with the PEM keys in
+    # JWT_SIGNING_KEYS_DIR and publish them at /.well-known/jwks.json
+    JWT_SECRET_KEY: str | None = None
     JWT_ALGORITHM: str
+    JWT_SIGNING_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    JWT_KEYS_RELOAD_SECONDS: int = 60
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # redis (REDIS_UNIX_SOCKET_PATH takes precedence over host/port)
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str | None = None
+    REDIS_UNIX_SOCKET_PATH: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 0.5
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    # logout broadcast to every service's in-process token caches
+    TOKEN_INVALIDATION_CHANNEL: str = "auth:token:invalidate"
+
+    # bcrypt process pool (workers default to the number of CPUs)
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
     class Config:
         env_file = BASE_DIR / ".env"
 
@@ -0,0 +1,87 @@
+import threading
+import time
+from pathlib import Path
+
+from jose import jwk
+
+from app.core.config import settings
+
+ASYMMETRIC_PREFIXES = ("RS", "ES", "PS")
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm.upper().startswith(ASYMMETRIC_PREFIXES)
+
+
+class KeyRing:
+    '''
+    Private signing keys loaded from `JWT_SIGNING_KEYS_DIR`, one `<kid>.pem` per key.
+
+    Rotation is done on disk: drop a new key next to the current one (it is
+    published in the JWKS straight away), switch `JWT_ACTIVE_KID` once every
+    verifier has picked it up, and delete the old file after its last token
+    has expired. The directory is re-read at most every `JWT_KEYS_RELOAD_SECONDS`.
+    '''
+
+    def __init__(self, keys_dir: str | None, algorithm: str, active_kid: str | None):
+        self.keys_dir = Path(keys_dir) if keys_dir else None
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self._private_keys: dict[str, str] = {}
+        self._public_jwks: dict[str, dict] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        private_keys: dict[str, str] = {}
+        public_jwks: dict[str, dict] = {}
+
+        for path in sorted(self.keys_dir.glob("*.pem")):
+            kid = path.stem
+            pem = path.read_text()
+            public_jwk = jwk.construct(pem, self.algorithm).public_key().to_dict()
+            public_jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            private_keys[kid] = pem
+            public_jwks[kid] = public_jwk
+
+        if not private_keys:
+            raise RuntimeError(f"No signing keys found in {self.keys_dir}")
+
+        self._private_keys = private_keys
+        self._public_jwks = public_jwks
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self.keys_dir is None:
+            raise RuntimeError("JWT_SIGNING_KEYS_DIR is required for asymmetric JWT algorithms")
+
+        if self._private_keys and time.monotonic() - self._loaded_at < settings.JWT_KEYS_RELOAD_SECONDS:
+            return
+
+        with self._lock:
+            if self._private_keys and time.monotonic() - self._loaded_at < settings.JWT_KEYS_RELOAD_SECONDS:
+                return
+            self._load()
+
+    def signing_key(self) -> tuple[str, str]:
+        self._ensure_loaded()
+        # newest key by name when no active kid is pinned
+        kid = self.active_kid or max(self._private_keys)
+        if kid not in self._private_keys:
+            raise RuntimeError(f"Active signing key '{kid}' not found in {self.keys_dir}")
+        return kid, self._private_keys[kid]
+
+    def public_key(self, kid: str) -> dict | None:
+        self._ensure_loaded()
+        return self._public_jwks.get(kid)
+
+    def jwks(self) -> dict:
+        self._ensure_loaded()
+        return {"keys": list(self._public_jwks.values())}
+
+
+key_ring = KeyRing(
+    keys_dir=settings.JWT_SIGNING_KEYS_DIR,
+    algorithm=settings.JWT_ALGORITHM,
+    active_kid=settings.JWT_ACTIVE_KID,
+)
@@ -5,6 +5,7 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.keys import key_ring, is_asymmetric
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -27,6 +28,16 @@ def create_access_token(data: dict) -> str:
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode.update({"exp": expire})
+
+    if is_asymmetric(settings.JWT_ALGORITHM):
+        kid, private_key = key_ring.signing_key()
+        return jwt.encode(
+            to_encode,
+            private_key,
+            algorithm=settings.JWT_ALGORITHM,
+            headers={"kid": kid}
+        )
+
     return jwt.encode(
         to_encode,
         settings.JWT_SECRET_KEY,
@@ -34,6 +45,17 @@ def create_access_token(data: dict) -> str:
     )
 
 def decode_token(token: str) -> dict:
+    if is_asymmetric(settings.JWT_ALGORITHM):
+        kid = jwt.get_unverified_header(token).get("kid")
+        public_key = key_ring.public_key(kid) if kid else None
+        if public_key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(
+            token,
+            public_key,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+
     return jwt.decode(
         token,
         settings.JWT_SECRET_KEY,
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.core.token_codec import token_cache_key, legacy_token_cache_key, token_fingerprint, encode_cached_user
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+# fingerprints of logged-out tokens scored by their `exp`; the services load it
+# whenever they (re)subscribe to TOKEN_INVALIDATION_CHANNEL
+REVOKED_TOKENS_KEY = "auth:token:revoked"
+
+
+# set the cache entry unless the token was logged out in the meantime
+CACHE_UNLESS_REVOKED_SCRIPT = """
+if redis.call("zscore", KEYS[2], ARGV[3]) then
+    return 0
+end
+redis.call("set", KEYS[1], ARGV[1], "EX", ARGV[2])
+return 1
+"""
+
+# warm-ups still running in this worker, referenced so they are not collected
+_pending_warmups: set[asyncio.Task] = set()
+
+
+async def cache_validated_token(token: str, user_data: dict):
+    '''
+    Write-through of a freshly issued token into the shared validation cache so
+    the first authenticated request after login does not miss.
+    The key and value layout must match what task_service / user_service read.
+    '''
+    try:
+        await redis_client.eval(
+            CACHE_UNLESS_REVOKED_SCRIPT,
+            2,
+            token_cache_key(token),
+            REVOKED_TOKENS_KEY,
+            encode_cached_user(user_data),
+            settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            token_fingerprint(token),
+        )
+    except REDIS_ERRORS:
+        # the services fall back to /auth/validate-token on a miss
+        pass
+
+
+def warm_token_cache(token: str, user_data: dict):
+    '''
+    Run cache_validated_token in the background: the login response does not
+    wait for Redis, and a logout that overtakes the write is still honoured.
+    '''
+    task = asyncio.create_task(cache_validated_token(token, user_data))
+    _pending_warmups.add(task)
+    task.add_done_callback(_pending_warmups.discard)
+
+
+async def revoke_token(token: str, exp: int):
+    '''
+    Log `token` out everywhere: drop it from the shared validation cache, list
+    it as revoked until it would have expired anyway, and tell every worker of
+    every service to evict it from their in-process caches.
+    Redis errors propagate: a logout that did not happen must not look like one.
+    '''
+    fingerprint = token_fingerprint(token)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(token_cache_key(token), legacy_token_cache_key(token))
+        pipe.zadd(REVOKED_TOKENS_KEY, {fingerprint: exp})
+        # expired tokens are rejected on their own, keep the list short
+        pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", time.time())
+        pipe.publish(
+            settings.TOKEN_INVALIDATION_CHANNEL,
+            json.dumps({"token": fingerprint, "revoked_until": exp}),
+        )
+        await pipe.execute()
+
+
+async def is_token_revoked(token: str) -> bool:
+    try:
+        return await redis_client.zscore(REVOKED_TOKENS_KEY, token_fingerprint(token)) is not None
+    except REDIS_ERRORS:
+        # like the rest of token validation, keep working while redis is down;
+        # tokens are short-lived
+        return False
@@ -0,0 +1,50 @@
+import base64
+import hashlib
+import json
+
+import msgpack
+
+# token cache value layout: [version, auth_user_id, email, is_active, created_at]
+TOKEN_CACHE_FORMAT_VERSION = 1
+
+
+def token_cache_key(token: str) -> str:
+    # fixed-size key: sha256 of the token instead of the raw JWT
+    digest = hashlib.sha256(token.encode()).digest()
+    return "auth:tk:" + base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def token_fingerprint(token: str) -> str:
+    # same as identity.token_fingerprint in the other services
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def legacy_token_cache_key(token: str) -> str:
+    # pre-digest layout, still read until those entries have expired
+    return f"auth:token:{token}"
+
+
+def encode_cached_user(user_data: dict) -> bytes:
+    return msgpack.packb([
+        TOKEN_CACHE_FORMAT_VERSION,
+        user_data["auth_user_id"],
+        user_data["email"],
+        user_data["is_active"],
+        user_data["created_at"],
+    ])
+
+
+def decode_cached_user(raw: bytes) -> dict:
+    # legacy entries are JSON objects
+    if raw[:1] == b"{":
+        return json.loads(raw)
+
+    version, auth_user_id, email, is_active, created_at = msgpack.unpackb(raw)
+    if version != TOKEN_CACHE_FORMAT_VERSION:
+        raise ValueError(f"Unknown token cache format {version}")
+    return {
+        "auth_user_id": auth_user_id,
+        "email": email,
+        "is_active": is_active,
+        "created_at": created_at,
+    }
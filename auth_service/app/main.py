@@ -1,13 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.exceptions import RequestValidationError
 
 from app.core.responses import error_response
 from app.core.config import settings
-from app.routers import auth
+from app.core.hashing import password_hasher
+from app.routers import auth, jwks
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    password_hasher.start()
+    try:
+        yield
+    finally:
+        password_hasher.stop()
+
 
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.include_router(auth.router)
+app.include_router(jwks.router)
 
 @app.exception_handler(HTTPException)
 async def app_exception_handler(request: Request, exc: HTTPException):
@@ -1,7 +1,6 @@
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from fastapi.security import OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.responses import success_response, error_response
 from app.dependencies.db import get_db
@@ -10,25 +9,26 @@ from app.schemas.auth import (
     LoginRequest, 
     TokenResponse, 
     TokenValidationRequest, 
-    TokenValidationResponse, 
     RegisterResponse )
 from app.services.auth_service import AuthService
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+security = HTTPBearer()
+
 @router.post("/register", status_code=201)
-async def register(payload: RegisterRequest, db: Session = Depends(get_db)):
+async def register(payload: RegisterRequest, db: AsyncSession = Depends(get_db)):
     service = AuthService(db)
-    user = service.register_user(payload.email, payload.password)
+    user = await service.register_user(payload.email, payload.password)
     data = RegisterResponse.model_validate(user).model_dump(mode="json")
     return success_response(data = data, status_code = status.HTTP_201_CREATED, message = "User registered successfully.")
 
 
 @router.post("/login")
-async def login(payload: LoginRequest, db: Session = Depends(get_db)):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
     service = AuthService(db)
-    token = service.authenticate_user(payload.email, payload.password)
+    token = await service.authenticate_user(payload.email, payload.password)
     token_response_model = TokenResponse(access_token = token)
     data = TokenResponse.model_validate(token_response_model).model_dump(mode="json")
     return success_response(data = data, status_code = status.HTTP_200_OK, message = "User logged-in successfully.")
@@ -36,10 +36,12 @@ async def login(payload: LoginRequest, db: Session = Depends(get_db)):
 
 @router.post("/validate-token")
 async def validate(payload: TokenValidationRequest):
-    validated_payload = AuthService.validate_token(payload.token)
-    tokenvalidate_response = TokenValidationResponse(auth_user_id= int(validated_payload["sub"])
-                                                     ,email= validated_payload["email"]
-                                                     ,is_active= bool(validated_payload["is_active"])
-                                                     ,created_at= datetime.fromisoformat(validated_payload["created_at"]) )
-    data = TokenValidationResponse.model_validate(tokenvalidate_response).model_dump(mode="json")
-    return success_response(data = data, status_code = status.HTTP_200_OK, message = "User validated successfully.")
\ No newline at end of file
+    validated_payload = await AuthService.validate_active_token(payload.token)
+    data = AuthService.token_validation_data(validated_payload)
+    return success_response(data = data, status_code = status.HTTP_200_OK, message = "User validated successfully.")
+
+
+@router.post("/logout")
+async def logout(authorization: HTTPAuthorizationCredentials = Depends(security)):
+    await AuthService.logout(authorization.credentials)
+    return success_response(status_code = status.HTTP_200_OK, message = "User logged-out successfully.")
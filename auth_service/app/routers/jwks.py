@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.keys import key_ring, is_asymmetric
+
+router = APIRouter(tags=["JWKS"])
+
+
+@router.get("/.well-known/jwks.json")
+async def jwks():
+    if not is_asymmetric(settings.JWT_ALGORITHM):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="JWKS is only published for asymmetric signing algorithms"
+        )
+
+    # plain JWKS document (not the success envelope) so standard clients can read it
+    return JSONResponse(
+        content=key_ring.jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.JWT_KEYS_RELOAD_SECONDS}"}
+    )
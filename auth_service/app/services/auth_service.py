@@ -1,21 +1,25 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.user import User
+from app.schemas.auth import TokenValidationResponse
+from app.core.token_cache import warm_token_cache, revoke_token, is_token_revoked, REDIS_ERRORS
+from app.core.hashing import password_hasher
 from app.core.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     decode_token,
 )
 
 class AuthService:
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def register_user(self, email: str, password: str) -> User:
-        existing_user = self.db.query(User).filter(User.email == email).first()
+    async def register_user(self, email: str, password: str) -> User:
+        existing_user = await self.db.scalar(select(User).where(User.email == email))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,25 +28,35 @@ class AuthService:
 
         user = User(
             email=email,
-            password_hash=hash_password(password)
+            password_hash=await password_hasher.hash(password)
         )
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
 
-    def authenticate_user(self, email: str, password: str) -> str:
-        user = self.db.query(User).filter(User.email == email).first()
-        if not user or not verify_password(password, user.password_hash):
+    async def authenticate_user(self, email: str, password: str) -> str:
+        user = await self.db.scalar(select(User).where(User.email == email))
+        if not user or not await password_hasher.verify(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
-        token = create_access_token(
-            data={"sub": str(user.id), "email": user.email, "is_active" : str(user.is_active), "created_at": str(user.created_at)}
-        )
+        claims = {"sub": str(user.id), "email": user.email, "is_active" : str(user.is_active), "created_at": str(user.created_at)}
+        token = create_access_token(data=claims)
+
+        # warm the shared cache with exactly what /auth/validate-token would return
+        warm_token_cache(token, self.token_validation_data(claims))
         return token
+
+    @staticmethod
+    def token_validation_data(payload: dict) -> dict:
+        tokenvalidate_response = TokenValidationResponse(auth_user_id= int(payload["sub"])
+                                                         ,email= payload["email"]
+                                                         ,is_active= bool(payload["is_active"])
+                                                         ,created_at= datetime.fromisoformat(payload["created_at"]) )
+        return TokenValidationResponse.model_validate(tokenvalidate_response).model_dump(mode="json")
     
     @staticmethod
     def validate_token(token: str) -> dict:
@@ -53,4 +67,25 @@ class AuthService:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired token"
-            )
\ No newline at end of file
+            )
+
+    @classmethod
+    async def validate_active_token(cls, token: str) -> dict:
+        payload = cls.validate_token(token)
+        if await is_token_revoked(token):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token"
+            )
+        return payload
+
+    @classmethod
+    async def logout(cls, token: str):
+        payload = await cls.validate_active_token(token)
+        try:
+            await revoke_token(token, int(payload["exp"]))
+        except REDIS_ERRORS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Logout is temporarily unavailable"
+            )
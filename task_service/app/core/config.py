@@ -9,9 +9,99 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
 
+    # application-level sharding: shard name -> database URL (JSON in the env).
+    # Empty means one shard on DATABASE_URL. Users are placed by consistent
+    # hashing of the shard *names*, so adding a shard rehomes ~1/N of them:
+    # only ever change this through `app.jobs.rebalance_shards` (pin, deploy, move).
+    TASK_SHARDS: dict[str, str] = {}
+    TASK_SHARD_VNODES: int = 128
+    # how long a worker trusts its copy of a user's shard override / freeze flag
+    TASK_SHARD_OVERRIDE_CACHE_SECONDS: float = 5.0
+
+    # optional read replicas of DATABASE_URL when unsharded (JSON list in the env),
+    # and of the TASK_SHARDS databases by shard name
+    DATABASE_REPLICA_URLS: list[str] = []
+    TASK_SHARD_REPLICAS: dict[str, list[str]] = {}
+    # replicas further behind than this are skipped (reads fall back to the primary)
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_SECONDS: float = 2.0
+    # redis key prefix of each user's last write position (read-your-writes)
+    READ_YOUR_WRITES_KEY_PREFIX: str = "tasks:rw"
+
     AUTH_SERVICE_URL: str
     USER_SERVICE_URL: str
 
+    # GET /tasks page size
+    TASK_PAGE_DEFAULT_LIMIT: int = 50
+    TASK_PAGE_MAX_LIMIT: int = 200
+
+    # max items per /tasks/bulk request
+    TASK_BULK_MAX_ITEMS: int = 500
+
+    # rows fetched per server-side cursor round trip in GET /tasks/export
+    TASK_EXPORT_BATCH_SIZE: int = 1000
+
+    # per-user GET /tasks result cache, invalidated by a generation counter
+    TASK_LIST_CACHE_ENABLED: bool = True
+    TASK_LIST_CACHE_TTL_SECONDS: int = 60
+
+    # GET /tasks/stream change feed (one redis subscription per worker)
+    TASK_EVENTS_CHANNEL: str = "tasks:events"
+    TASK_STREAM_QUEUE_SIZE: int = 100
+    TASK_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # connections are closed after this long; EventSource reconnects (and re-authenticates)
+    TASK_STREAM_MAX_SECONDS: int = 900
+
+    # purge of a deleted user's tasks, driven by user_service outbox events
+    USER_EVENTS_STREAM: str = "users:events"
+    TASK_PURGE_WORKER_ENABLED: bool = True
+    TASK_PURGE_CONSUMER_GROUP: str = "task_service"
+    # rows per DELETE and pause between chunks (~2500 rows/s per worker by default)
+    TASK_PURGE_CHUNK_SIZE: int = 500
+    TASK_PURGE_CHUNK_DELAY_SECONDS: float = 0.2
+    TASK_PURGE_IDLE_SECONDS: float = 5.0
+
+    # redis (REDIS_UNIX_SOCKET_PATH takes precedence over host/port)
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str | None = None
+    REDIS_UNIX_SOCKET_PATH: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 0.5
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    # offline token verification against the auth service JWKS (unset = disabled)
+    JWKS_URL: str | None = None
+    # each token is verified with its JWK's own `alg`, which must be one of these
+    JWKS_ALLOWED_ALGORITHMS: list[str] = ["RS256", "ES256"]
+    JWKS_REFRESH_SECONDS: int = 300
+    JWKS_MIN_REFRESH_SECONDS: int = 30
+
+    # identity header signed by the API gateway (unset = always validate tokens)
+    INTERNAL_IDENTITY_SECRET: str | None = None
+    INTERNAL_IDENTITY_HEADER: str = "X-Internal-Identity"
+
+    # also read `auth:token:<jwt>` JSON entries written before digest keys
+    TOKEN_CACHE_READ_LEGACY_KEYS: bool = True
+
+    # in-process token cache in front of Redis
+    TOKEN_L1_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_L1_CACHE_TTL_SECONDS: int = 60
+    TOKEN_INVALIDATION_CHANNEL: str = "auth:token:invalidate"
+    # logged-out, not yet expired tokens remembered per worker
+    TOKEN_REVOCATION_MAX_ENTRIES: int = 100000
+
+    # negative cache for tokens the auth service rejected
+    TOKEN_NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_NEGATIVE_CACHE_TTL_SECONDS: int = 60
+
+    # single-flight validation: cross-worker lock lifetime and cache poll interval
+    TOKEN_VALIDATION_LOCK_MS: int = 3000
+    TOKEN_VALIDATION_POLL_MS: int = 25
+
     class Config:
         env_file = BASE_DIR / ".env"
 
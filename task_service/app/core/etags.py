@@ -0,0 +1,42 @@
+import hashlib
+
+from fastapi import HTTPException, status
+
+
+def task_etag(task_id: int, version: int) -> str:
+    return f'"{task_id}.{version}"'
+
+
+def list_etag(change_count: int, count: int, params_digest: str) -> str:
+    # change_count moves on every write; count also moves when the counters are repaired
+    raw = f"{change_count}:{count}:{params_digest}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest()[:20] + '"'
+
+
+def etag_matches(header_value: str | None, etag: str) -> bool:
+    '''`If-None-Match` semantics: `*` or any listed tag (weak prefix ignored).'''
+    if not header_value:
+        return False
+    candidates = [value.strip() for value in header_value.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def parse_if_match(header_value: str | None, task_id: int) -> int | None:
+    '''
+    Version a write is conditional on, from an `If-Match` carrying a task ETag.
+    None when there is no precondition (`*` only requires the task to exist).
+    Raises ValueError for a malformed tag and 412 for another task's tag.
+    '''
+    if header_value is None or header_value.strip() == "*":
+        return None
+
+    tag = header_value.strip().removeprefix("W/").strip('"')
+    etag_task_id, _, version = tag.partition(".")
+    if not etag_task_id.isdigit() or not version.isdigit():
+        raise ValueError("Invalid If-Match header")
+    if int(etag_task_id) != task_id:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task was modified by another request",
+        )
+    return int(version)
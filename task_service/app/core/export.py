@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+EXPORT_COLUMNS = ("id", "title", "description", "status", "created_at")
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _row_values(row) -> list:
+    return [
+        row.id,
+        row.title,
+        row.description,
+        row.status,
+        row.created_at.isoformat() if row.created_at is not None else None,
+    ]
+
+
+def ndjson_chunk(rows) -> bytes:
+    lines = (
+        json.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row))), ensure_ascii=False, separators=(",", ":"))
+        for row in rows
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue().encode()
+
+
+def csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_row_values(row) for row in rows)
+    return buffer.getvalue().encode()
@@ -0,0 +1,50 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+
+from app.core.config import settings
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def token_fingerprint(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def verify_identity(header_value: str, token: str) -> dict | None:
+    '''
+    Verify the identity header signed by the API gateway.
+    Returns the user claims when the signature is valid, the header has not
+    expired and it was issued for this bearer token; otherwise None.
+    '''
+    if not settings.INTERNAL_IDENTITY_SECRET:
+        return None
+
+    payload, _, signature = header_value.partition(".")
+    if not payload or not signature:
+        return None
+
+    expected = hmac.new(
+        settings.INTERNAL_IDENTITY_SECRET.encode(),
+        payload.encode(),
+        hashlib.sha256,
+    ).digest()
+
+    try:
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (binascii.Error, ValueError):
+        return None
+
+    if claims.pop("exp", 0) <= time.time():
+        return None
+    if not hmac.compare_digest(claims.pop("tkn", ""), token_fingerprint(token)):
+        return None
+
+    return claims
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSCache:
+    '''
+    In-memory copy of the auth service JWKS, keyed by `kid`.
+    Refreshed in the background every `JWKS_REFRESH_SECONDS` and on demand
+    (rate limited) when a token arrives signed with a key we have not seen yet,
+    which is what happens right after a rotation.
+    '''
+
+    def __init__(self, url: str | None):
+        self.url = url
+        self._keys: dict[str, dict] = {}
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    async def refresh(self):
+        async with self._lock:
+            await self._refresh_locked()
+
+    async def _refresh_locked(self):
+        try:
+            async with httpx.AsyncClient(timeout=5) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                keys = response.json()["keys"]
+        except (httpx.HTTPError, KeyError, ValueError) as exc:
+            # keep serving the keys we already have
+            logger.warning("JWKS refresh from %s failed: %s", self.url, exc)
+            return
+        finally:
+            self._refreshed_at = time.monotonic()
+
+        usable = {}
+        for key in keys:
+            # never let the JWKS (or a token header) pick `none`, HMAC or anything unexpected
+            if "kid" not in key or key.get("alg") not in settings.JWKS_ALLOWED_ALGORITHMS:
+                logger.warning("Ignoring JWK %r with algorithm %r", key.get("kid"), key.get("alg"))
+                continue
+            usable[key["kid"]] = key
+        self._keys = usable
+
+    async def get_key(self, kid: str) -> dict | None:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        async with self._lock:
+            # another request may have refreshed while we waited
+            if kid not in self._keys and time.monotonic() - self._refreshed_at >= settings.JWKS_MIN_REFRESH_SECONDS:
+                await self._refresh_locked()
+
+        return self._keys.get(kid)
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(settings.JWKS_REFRESH_SECONDS)
+            await self.refresh()
+
+    async def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+jwks_cache = JWKSCache(settings.JWKS_URL)
@@ -0,0 +1,24 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, task_id: int, order: str) -> str:
+    # opaque to clients; only the service reads it back
+    raw = json.dumps({"c": created_at.isoformat(), "i": task_id, "o": order}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, order: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        created_at, task_id, cursor_order = datetime.fromisoformat(data["c"]), int(data["i"]), data["o"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if cursor_order != order:
+        raise ValueError("Cursor does not match the requested sort order")
+
+    return created_at, task_id
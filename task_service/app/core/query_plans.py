@@ -0,0 +1,69 @@
+from typing import Any, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    '''`EXPLAIN (FORMAT JSON[, ANALYZE]) <statement>` for any SQLAlchemy statement.'''
+
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw):
+    options = "FORMAT JSON, ANALYZE" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) " + compiler.process(element.statement, **kw)
+
+
+async def explain(db: AsyncSession, statement, analyze: bool = False) -> dict[str, Any]:
+    '''
+    Root plan node chosen by PostgreSQL for `statement`, e.g.
+
+        plan = await explain(db, TaskService(db, user).list_statement(limit=50))
+        assert uses_index(plan, await partition_names(db, "ix_tasks_auth_user_id_created_at_id"))
+        assert not has_seq_scan(plan, await partition_names(db, "tasks"))
+    '''
+    result = await db.execute(Explain(statement, analyze=analyze))
+    return result.scalar()[0]["Plan"]
+
+
+async def partition_names(db: AsyncSession, relation: str) -> set[str]:
+    '''
+    `relation` and all its partitions. Plans of a partitioned table name the
+    partitions it scans (`tasks_p03`) and their indexes, never the parent.
+    '''
+    result = await db.execute(
+        text("SELECT relid::regclass::text FROM pg_partition_tree(CAST(:relation AS regclass))"),
+        {"relation": relation},
+    )
+    return set(result.scalars())
+
+
+def _names(names: str | Iterable[str]) -> set[str]:
+    return {names} if isinstance(names, str) else set(names)
+
+
+def iter_plan_nodes(plan: dict[str, Any]):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_plan_nodes(child)
+
+
+def uses_index(plan: dict[str, Any], index_names: str | Iterable[str]) -> bool:
+    index_names = _names(index_names)
+    return any(node.get("Index Name") in index_names for node in iter_plan_nodes(plan))
+
+
+def has_seq_scan(plan: dict[str, Any], table_names: str | Iterable[str]) -> bool:
+    table_names = _names(table_names)
+    return any(
+        node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in table_names
+        for node in iter_plan_nodes(plan)
+    )
@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+
+from redis.exceptions import ConnectionError, TimeoutError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.core.database import build_engine, build_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+PRIMARY_LSN_QUERY = text("SELECT pg_current_wal_lsn()::text")
+
+# measured against the primary's current WAL position: a replica that has
+# replayed up to it is 0 behind no matter how idle the primary is, and one that
+# lost its WAL stream is caught by `streaming` instead of looking caught up.
+# pg_stat_wal_receiver needs the pg_read_all_stats (or pg_monitor) role.
+REPLICA_STATUS_QUERY = text(
+    """
+    SELECT
+        pg_is_in_recovery() AS in_recovery,
+        EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') AS streaming,
+        pg_last_wal_replay_lsn()::text AS replay_lsn,
+        CASE
+            WHEN pg_last_wal_replay_lsn() >= CAST(:primary_lsn AS pg_lsn) THEN 0
+            ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+        END AS lag
+    """
+)
+
+
+def parse_lsn(value: str) -> int:
+    '''"16/B374D848" -> a byte position that compares like the LSN.'''
+    high, low = value.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = build_engine(url)
+        self.sessionmaker = build_sessionmaker(self.engine)
+        self.host = self.engine.url.host
+        # None until the first successful check, and while unreachable
+        self.lag: float | None = None
+        self.replay_lsn: int | None = None
+        self.checked_at = 0.0
+
+    def estimated_lag(self) -> float | None:
+        if self.lag is None:
+            return None
+        since_check = time.monotonic() - self.checked_at
+        if since_check > settings.REPLICA_HEALTH_CHECK_SECONDS * 3:
+            # the checker itself is stuck; do not trust an old reading
+            return None
+        # worst case it fell further behind since it was measured
+        return self.lag + since_check
+
+
+class ReplicaSet:
+    '''
+    Read-only copies of one primary. A background task measures every
+    replica's lag and replay position; reads go round-robin to replicas within
+    REPLICA_MAX_LAG_SECONDS that have also replayed the reader's own last write
+    (see `record_write`). With no such replica they use the primary.
+    '''
+
+    def __init__(self, primary: async_sessionmaker[AsyncSession], urls: list[str]):
+        self.primary = primary
+        self.replicas = [Replica(url) for url in urls]
+        self._turn = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    def pick(self, min_lsn: int | None = None) -> tuple[async_sessionmaker[AsyncSession], Replica | None]:
+        healthy = [
+            replica for replica in self.replicas
+            if (lag := replica.estimated_lag()) is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+            # replay only moves forward, so an older reading errs on the safe side
+            and (min_lsn is None or (replica.replay_lsn is not None and replica.replay_lsn >= min_lsn))
+        ]
+        if not healthy:
+            return self.primary, None
+        replica = healthy[next(self._turn) % len(healthy)]
+        return replica.sessionmaker, replica
+
+    def write_session(self) -> AsyncSession:
+        session = self.primary()
+        # lets `record_write` find the replicas this primary feeds
+        session.info["replica_set"] = self
+        return session
+
+    async def read_session(self, auth_user_id: int) -> AsyncSession:
+        '''A session on a replica that already has the user's own writes, or on the primary.'''
+        sessionmaker, replica = self.primary, None
+        if self.replicas:
+            try:
+                min_lsn = await redis_client.get(_last_write_key(auth_user_id))
+            except REDIS_ERRORS:
+                # cannot tell what the user has written: stay on the primary
+                pass
+            else:
+                sessionmaker, replica = self.pick(int(min_lsn) if min_lsn is not None else None)
+        session = sessionmaker()
+        # lets callers keep replica reads out of shared caches
+        session.info["replica"] = replica.host if replica is not None else None
+        return session
+
+    async def _primary_lsn(self) -> str | None:
+        try:
+            async with self.primary() as db:
+                return await asyncio.wait_for(db.scalar(PRIMARY_LSN_QUERY), timeout=settings.REPLICA_HEALTH_CHECK_SECONDS)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+            logger.warning("Primary failed the replica health check", exc_info=True)
+            return None
+
+    async def _check(self, replica: Replica, primary_lsn: str | None):
+        replica.lag = None
+        try:
+            if primary_lsn is not None:
+                async with replica.engine.connect() as conn:
+                    row = (await asyncio.wait_for(
+                        conn.execute(REPLICA_STATUS_QUERY, {"primary_lsn": primary_lsn}),
+                        timeout=settings.REPLICA_HEALTH_CHECK_SECONDS,
+                    )).one()
+                replica.replay_lsn = parse_lsn(row.replay_lsn) if row.replay_lsn is not None else None
+                # not in recovery: promoted or misconfigured; not streaming: lag unknowable
+                if row.in_recovery and row.streaming and row.lag is not None:
+                    replica.lag = float(row.lag)
+                else:
+                    logger.warning("Replica %s is not streaming from the primary", replica.host)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+            logger.warning("Replica %s failed its health check", replica.host, exc_info=True)
+        replica.checked_at = time.monotonic()
+
+    async def _run(self):
+        while True:
+            primary_lsn = await self._primary_lsn()
+            await asyncio.gather(*(self._check(replica, primary_lsn) for replica in self.replicas))
+            await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+    def start(self):
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def _last_write_key(auth_user_id: int) -> str:
+    return f"{settings.READ_YOUR_WRITES_KEY_PREFIX}:{auth_user_id}"
+
+
+async def record_write(db: AsyncSession, auth_user_id: int):
+    '''
+    Call right after committing a write on a `write_session`: stores the
+    primary's WAL position for the user, so their reads skip replicas that have
+    not replayed it. Past REPLICA_MAX_LAG_SECONDS every replica in use has it
+    anyway, so the marker expires then. No-op without replicas.
+    '''
+    replica_set = db.info.get("replica_set")
+    if replica_set is None or not replica_set.replicas:
+        return
+
+    try:
+        # at or past the commit record of the transaction just committed
+        lsn = parse_lsn(await db.scalar(PRIMARY_LSN_QUERY))
+        await db.commit()
+        await redis_client.set(_last_write_key(auth_user_id), lsn, ex=math.ceil(settings.REPLICA_MAX_LAG_SECONDS))
+    except (SQLAlchemyError, OSError, *REDIS_ERRORS):
+        # the write itself succeeded; at worst the next read is briefly stale
+        logger.warning("Could not record the write position of user %s", auth_user_id, exc_info=True)
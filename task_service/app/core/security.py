@@ -0,0 +1,79 @@
+import time
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from jose import jwt, JWTError
+from pydantic import BaseModel
+
+from app.core.jwks import jwks_cache
+
+
+class IdentityClaims(BaseModel):
+    # mirrors TokenValidationResponse returned by /auth/validate-token
+    auth_user_id: int
+    email: str
+    is_active: bool = True
+    created_at: datetime
+
+
+def precheck_token(token: str):
+    '''
+    Reject tokens that can never validate before any network call: anything
+    that is not a well-formed JWT, has no `exp`, or has already expired.
+    The signature is not checked here.
+    '''
+    try:
+        if token.count(".") != 2:
+            raise JWTError("Not a JWT")
+        jwt.get_unverified_header(token)
+        exp = float(jwt.get_unverified_claims(token)["exp"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    if exp <= time.time():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token expired"
+        )
+
+
+async def decode_token_offline(token: str) -> dict | None:
+    '''
+    Verify `token` against the cached JWKS without calling the auth service.
+    Returns the user claims, raises 401 for a token that is definitely invalid,
+    and returns None when it can not be checked locally (JWKS disabled or the
+    signing key is unavailable) so the caller can fall back to the auth service.
+    '''
+    if not jwks_cache.enabled:
+        return None
+
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    kid = header.get("kid")
+    key = await jwks_cache.get_key(kid) if kid else None
+    if key is None:
+        return None
+
+    try:
+        # the key decides the algorithm (allow-listed when the JWKS was loaded)
+        payload = jwt.decode(token, key, algorithms=[key["alg"]])
+        return IdentityClaims(
+            auth_user_id=int(payload["sub"]),
+            email=payload["email"],
+            is_active=bool(payload["is_active"]),
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        ).model_dump(mode="json")
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
@@ -0,0 +1,116 @@
+import bisect
+import hashlib
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, build_engine, build_sessionmaker
+from app.core.replicas import ReplicaSet
+from app.models.task_shard_override import TaskShardOverride
+
+# name of the single shard when TASK_SHARDS is not configured
+DEFAULT_SHARD = "default"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.sha1(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    '''
+    Consistent-hash ring with `vnodes` points per node. Adding or removing a
+    node only remaps the keys on the arcs it gains or loses.
+    '''
+
+    def __init__(self, nodes: list[str], vnodes: int):
+        points = sorted((_hash(f"{node}#{index}"), node) for node in nodes for index in range(vnodes))
+        self._points = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._nodes[index]
+
+
+class ShardMap:
+    '''
+    Routes each auth_user_id to one task database: an explicit override from
+    `task_shard_overrides` if there is one, otherwise the hash-ring home.
+    One engine and session factory per shard, created at import time like the
+    single engine in `app.core.database`.
+    '''
+
+    def __init__(self):
+        if settings.TASK_SHARDS:
+            self.engines = {name: build_engine(url) for name, url in settings.TASK_SHARDS.items()}
+        else:
+            self.engines = {DEFAULT_SHARD: engine}
+        self.sessionmakers: dict[str, async_sessionmaker[AsyncSession]] = {
+            name: build_sessionmaker(shard_engine) for name, shard_engine in self.engines.items()
+        }
+        self.replicas = {
+            name: ReplicaSet(
+                sessionmaker,
+                settings.TASK_SHARD_REPLICAS.get(name, []) if settings.TASK_SHARDS else settings.DATABASE_REPLICA_URLS,
+            )
+            for name, sessionmaker in self.sessionmakers.items()
+        }
+        self.ring = HashRing(sorted(self.engines), settings.TASK_SHARD_VNODES)
+        # auth_user_id -> (override shard or None, frozen)
+        self._overrides = TTLCache(max_entries=100_000, default_ttl=settings.TASK_SHARD_OVERRIDE_CACHE_SECONDS)
+
+    def home_shard(self, auth_user_id: int) -> str:
+        return self.ring.node_for(str(auth_user_id))
+
+    async def _override(self, auth_user_id: int) -> tuple[str | None, bool]:
+        if not settings.TASK_SHARDS:
+            return None, False
+
+        cached = self._overrides.get(auth_user_id)
+        if cached is None:
+            async with SessionLocal() as db:
+                row = (await db.execute(
+                    select(TaskShardOverride.shard, TaskShardOverride.frozen)
+                    .where(TaskShardOverride.auth_user_id == auth_user_id)
+                )).one_or_none()
+            cached = (row.shard, row.frozen) if row is not None else (None, False)
+            self._overrides.set(auth_user_id, cached)
+        return cached
+
+    async def resolve(self, auth_user_id: int) -> tuple[str, bool]:
+        '''(shard name, frozen) for the user.'''
+        shard, frozen = await self._override(auth_user_id)
+        return shard or self.home_shard(auth_user_id), frozen
+
+    async def _writable_shard(self, auth_user_id: int) -> str:
+        shard, frozen = await self.resolve(auth_user_id)
+        if frozen:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Tasks are being moved, retry in a few seconds",
+            )
+        return shard
+
+    async def session_for(self, auth_user_id: int) -> AsyncSession:
+        return self.replicas[await self._writable_shard(auth_user_id)].write_session()
+
+    async def read_session_for(self, auth_user_id: int) -> AsyncSession:
+        '''A session on a healthy replica of the user's shard, or on its primary.'''
+        return await self.replicas[await self._writable_shard(auth_user_id)].read_session(auth_user_id)
+
+    def start(self):
+        for replica_set in self.replicas.values():
+            replica_set.start()
+
+    async def dispose(self):
+        for replica_set in self.replicas.values():
+            await replica_set.stop()
+        # the directory engine too, when it is not one of the shards
+        for shard_engine in {*self.engines.values(), engine}:
+            await shard_engine.dispose()
+
+
+shard_map = ShardMap()
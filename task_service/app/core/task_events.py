@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.config import settings
+from app.core.redis import redis_client, redis_pubsub_client
+
+logger = logging.getLogger(__name__)
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+# sent instead of events a client may have missed; it should refetch GET /tasks
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+def task_event(kind: str, task) -> dict:
+    return {
+        "type": f"task.{kind}",
+        "id": task.id,
+        "version": task.version,
+        "task": {"id": task.id, "title": task.title, "description": task.description, "status": task.status},
+    }
+
+
+def task_deleted_event(task_id: int) -> dict:
+    return {"type": "task.deleted", "id": task_id}
+
+
+def sse_frame(event: dict) -> bytes:
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n".encode()
+
+
+async def publish_task_events(auth_user_id: int, events: list[dict]):
+    '''
+    Announce committed task changes to every worker. Best effort: a client that
+    misses an event still converges on its next (ETag-conditional) GET /tasks.
+    '''
+    if not events:
+        return
+    try:
+        await redis_client.publish(
+            settings.TASK_EVENTS_CHANNEL,
+            json.dumps({"auth_user_id": auth_user_id, "events": events}),
+        )
+    except REDIS_ERRORS:
+        pass
+
+
+class TaskEventBroker:
+    '''
+    One pub/sub subscription per worker, fanned out in memory to the local
+    GET /tasks/stream connections of each user. Frames are encoded once per
+    event, not once per connection. A connection that falls behind, or any
+    connection while the subscription was down, gets a resync frame instead of
+    an unbounded backlog.
+    '''
+
+    def __init__(self):
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def subscribe(self, auth_user_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.TASK_STREAM_QUEUE_SIZE)
+        self._subscribers.setdefault(auth_user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(auth_user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[auth_user_id]
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, frame: bytes):
+        try:
+            queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_FRAME)
+
+    def dispatch(self, message: dict):
+        queues = self._subscribers.get(message["auth_user_id"])
+        if not queues:
+            return
+        for event in message["events"]:
+            frame = sse_frame(event)
+            for queue in queues:
+                self._deliver(queue, frame)
+
+    def _resync_all(self):
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._deliver(queue, RESYNC_FRAME)
+
+    async def _listen(self):
+        backoff = 1
+        connected_before = False
+        while True:
+            pubsub = redis_pubsub_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.TASK_EVENTS_CHANNEL)
+                if connected_before:
+                    # events published while we were away are gone
+                    self._resync_all()
+                connected_before = True
+                backoff = 1
+
+                async for message in pubsub.listen():
+                    try:
+                        self.dispatch(json.loads(message["data"]))
+                    except (ValueError, TypeError, KeyError, AttributeError):
+                        logger.warning("Ignoring malformed task event message: %r", message)
+            except (ConnectionError, ConnectionRefusedError, TimeoutError, OSError):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await pubsub.aclose()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+task_event_broker = TaskEventBroker()
+
+
+async def stream_task_events(auth_user_id: int) -> AsyncIterator[bytes]:
+    '''
+    SSE body for one connection: a ready event, then change events as they are
+    published, heartbeat comments while idle, and a clean close after
+    TASK_STREAM_MAX_SECONDS.
+    '''
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.TASK_STREAM_MAX_SECONDS
+
+    async with task_event_broker.subscribe(auth_user_id) as queue:
+        yield b"retry: 3000\nevent: ready\ndata: {}\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                frame = await asyncio.wait_for(queue.get(), timeout=min(settings.TASK_STREAM_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield HEARTBEAT_FRAME
+                continue
+            yield frame
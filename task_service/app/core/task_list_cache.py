@@ -0,0 +1,82 @@
+import hashlib
+
+import msgpack
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+# current generation and the entry cached under it, in one round trip
+READ_SCRIPT = """
+local generation = redis.call("get", KEYS[1]) or "0"
+return {generation, redis.call("get", ARGV[1] .. generation .. ":" .. ARGV[2])}
+"""
+
+
+def generation_key(auth_user_id: int) -> str:
+    return f"tasks:gen:{auth_user_id}"
+
+
+def _entry_prefix(auth_user_id: int) -> str:
+    return f"tasks:list:{auth_user_id}:"
+
+
+def params_digest(params: dict) -> str:
+    canonical = "&".join(f"{key}={params[key]}" for key in sorted(params) if params[key] is not None)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+async def get_cached_task_list(auth_user_id: int, params: dict) -> tuple[tuple[str, bytes] | None, str | None]:
+    '''
+    Cached `(etag, response body)` for this user and query, plus the generation
+    it was looked up under (pass it to `store_task_list`). (None, None) when Redis
+    is unavailable, in which case nothing should be stored either.
+    '''
+    if not settings.TASK_LIST_CACHE_ENABLED:
+        return None, None
+
+    try:
+        generation, body = await redis_client.eval(
+            READ_SCRIPT, 1, generation_key(auth_user_id), _entry_prefix(auth_user_id), params_digest(params)
+        )
+    except REDIS_ERRORS:
+        # serve from the database while redis is down
+        return None, None
+
+    generation = generation.decode() if isinstance(generation, bytes) else str(generation)
+    if body is None:
+        return None, generation
+
+    try:
+        etag, body = msgpack.unpackb(body)
+    except (ValueError, TypeError):
+        # entry from an older layout; rebuild it
+        return None, generation
+    return (etag, body), generation
+
+
+async def store_task_list(auth_user_id: int, generation: str | None, params: dict, etag: str, body: bytes):
+    if generation is None:
+        return
+    key = f"{_entry_prefix(auth_user_id)}{generation}:{params_digest(params)}"
+    try:
+        await redis_client.set(key, msgpack.packb([etag, body]), ex=settings.TASK_LIST_CACHE_TTL_SECONDS)
+    except REDIS_ERRORS:
+        pass
+
+
+async def bump_task_list_generation(auth_user_id: int):
+    '''
+    Invalidate every cached listing of the user without scanning keys: entries
+    under older generations are simply never read again and expire on their own.
+    '''
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.incr(generation_key(auth_user_id))
+            # must outlive every entry, or a reset counter could revive old ones
+            pipe.expire(generation_key(auth_user_id), max(settings.TASK_LIST_CACHE_TTL_SECONDS * 10, 86400))
+            await pipe.execute()
+    except REDIS_ERRORS:
+        pass
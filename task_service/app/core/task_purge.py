@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime
+
+from redis.exceptions import ConnectionError, TimeoutError, ResponseError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.sharding import shard_map
+from app.core.redis import redis_pubsub_client
+from app.models.task_purge_job import TaskPurgeJob
+from app.services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+# user_service outbox events that remove a user's tasks
+PURGE_EVENT_TYPES = {"user.profile_deleted", "user.deleted"}
+
+# unacknowledged events of a consumer that died are taken over after this long
+CLAIM_IDLE_MS = 60_000
+
+
+class UserBeingMoved(Exception):
+    pass
+
+
+class TaskPurgeWorker:
+    '''
+    Two background loops per task_service worker:
+
+    - consume: reads user deletion events from the `USER_EVENTS_STREAM`
+      consumer group and records a `task_purge_jobs` row per user, acking only
+      after the row is committed (events are delivered at least once; recording
+      the same one twice is harmless).
+    - purge: repeatedly takes an unfinished job (SKIP LOCKED, so workers share
+      the load) and deletes one chunk of its tasks, pausing between chunks.
+
+    Every bit of progress lives in Postgres, so restarts just carry on.
+    '''
+
+    def __init__(self):
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks: list[asyncio.Task] = []
+
+    async def _ensure_group(self):
+        try:
+            await redis_pubsub_client.xgroup_create(
+                settings.USER_EVENTS_STREAM, settings.TASK_PURGE_CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def record_event(self, fields: dict):
+        fields = {key.decode(): value.decode() for key, value in fields.items()}
+        if fields.get("type") not in PURGE_EVENT_TYPES:
+            return
+
+        auth_user_id = int(fields["auth_user_id"])
+        shard, frozen = await shard_map.resolve(auth_user_id)
+        if frozen:
+            # left unacked; claimed again once the move is over
+            raise UserBeingMoved(auth_user_id)
+
+        stmt = pg_insert(TaskPurgeJob).values(
+            auth_user_id=auth_user_id,
+            purge_before=datetime.fromisoformat(fields["occurred_at"]),
+            source_event_id=fields["event_id"],
+        )
+        # the job lives on the same shard as the tasks it deletes
+        async with shard_map.sessionmakers[shard]() as db:
+            # a later deletion (profile re-created, then deleted again) reopens the job
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[TaskPurgeJob.auth_user_id],
+                    set_={
+                        "purge_before": stmt.excluded.purge_before,
+                        "source_event_id": stmt.excluded.source_event_id,
+                        "completed_at": None,
+                    },
+                    where=TaskPurgeJob.source_event_id != stmt.excluded.source_event_id,
+                )
+            )
+            await db.commit()
+
+    async def _handle(self, messages: list):
+        for message_id, fields in messages:
+            try:
+                await self.record_event(fields)
+            except UserBeingMoved:
+                continue
+            except (KeyError, ValueError):
+                logger.warning("Dropping malformed user event %r: %r", message_id, fields)
+            await redis_pubsub_client.xack(settings.USER_EVENTS_STREAM, settings.TASK_PURGE_CONSUMER_GROUP, message_id)
+
+    async def _consume(self):
+        backoff = 1
+        while True:
+            try:
+                await self._ensure_group()
+                while True:
+                    claimed = await redis_pubsub_client.xautoclaim(
+                        settings.USER_EVENTS_STREAM,
+                        settings.TASK_PURGE_CONSUMER_GROUP,
+                        self.consumer_name,
+                        min_idle_time=CLAIM_IDLE_MS,
+                        count=100,
+                    )
+                    await self._handle(claimed[1])
+
+                    response = await redis_pubsub_client.xreadgroup(
+                        settings.TASK_PURGE_CONSUMER_GROUP,
+                        self.consumer_name,
+                        {settings.USER_EVENTS_STREAM: ">"},
+                        count=100,
+                        block=int(settings.TASK_PURGE_IDLE_SECONDS * 1000),
+                    )
+                    for _, messages in response or []:
+                        await self._handle(messages)
+                    backoff = 1
+            except REDIS_ERRORS + (ResponseError, OSError, SQLAlchemyError):
+                # unacked events stay pending and are claimed again later; a
+                # NOGROUP (stream or group deleted) is fixed by _ensure_group
+                logger.warning("User event consumer failed; retrying", exc_info=True)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    async def purge_once(self) -> bool:
+        # one chunk on every shard that has work
+        worked = False
+        for sessionmaker in shard_map.sessionmakers.values():
+            async with sessionmaker() as db:
+                job = await db.scalar(
+                    select(TaskPurgeJob)
+                    .where(TaskPurgeJob.completed_at.is_(None))
+                    .order_by(TaskPurgeJob.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                if job is None:
+                    continue
+
+                service = TaskService(db, {"auth_user_id": job.auth_user_id})
+                await service.purge_tasks_chunk(job, limit=settings.TASK_PURGE_CHUNK_SIZE)
+                worked = True
+        return worked
+
+    async def _purge(self):
+        while True:
+            try:
+                worked = await self.purge_once()
+            except (SQLAlchemyError, OSError):
+                logger.warning("Task purge chunk failed; retrying", exc_info=True)
+                worked = False
+            # the pause between chunks is the rate limit
+            await asyncio.sleep(settings.TASK_PURGE_CHUNK_DELAY_SECONDS if worked else settings.TASK_PURGE_IDLE_SECONDS)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._consume()), asyncio.create_task(self._purge())]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+task_purge_worker = TaskPurgeWorker()
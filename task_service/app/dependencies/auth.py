@@ -1,15 +1,15 @@
-import json
-import httpx
-from fastapi import Header, HTTPException, status, Depends
+from fastapi import Request, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import settings
-from app.core.redis import redis_client
-from redis.exceptions import ConnectionError
+from app.core.identity import verify_identity
+from app.core.security import decode_token_offline, precheck_token
+from app.core.token_cache import get_local_user, set_local_user, is_locally_invalid, set_locally_invalid
+from app.core.token_validation import read_cached_user, validate_token_coalesced
 
 security = HTTPBearer()
 
-async def get_current_user(authorization: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(request: Request, authorization: HTTPAuthorizationCredentials = Depends(security)):
     
     token = authorization.credentials
     
@@ -19,43 +19,45 @@ async def get_current_user(authorization: HTTPAuthorizationCredentials = Depends
             detail="Invalid authorization header"
         )
 
-    # try redis first
-    redis_key = f"auth:token:{token}"
-    
-    try: 
-        cached_user = await redis_client.get(redis_key)
-    except (ConnectionError, ConnectionRefusedError):
-        # Fallback to the Auth Service if Redis is down
-        cached_user = None
-    
-    if cached_user:
-        return json.loads(cached_user)
-
-    # fallback auth service call
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{settings.AUTH_SERVICE_URL}/auth/validate-token",
-                json={"token": token},
-                timeout=5
-            )
-        except httpx.RequestError:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Auth service unavailable"
-            )
-
-    if response.status_code != 200:
+    # trust the identity the gateway already verified for this token
+    identity_header = request.headers.get(settings.INTERNAL_IDENTITY_HEADER)
+    if identity_header:
+        identity = verify_identity(identity_header, token)
+        if identity is not None:
+            return identity
+
+    # in-process cache, no network I/O
+    local_user = get_local_user(token)
+    if local_user is not None:
+        return local_user
+
+    if is_locally_invalid(token):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
         )
 
-    user_data = response.json()["data"]
-    
-    # cached user data 
-    expires_in = response.json().get("expires_in", 900)
-    
-    await redis_client.set(redis_key, json.dumps(user_data), ex=expires_in)
-    
+    try:
+        # malformed / expired tokens never leave this process
+        precheck_token(token)
+        # verify the signature locally when the JWKS is available
+        offline_user = await decode_token_offline(token)
+    except HTTPException:
+        set_locally_invalid(token)
+        raise
+
+    if offline_user is not None:
+        set_local_user(token, offline_user)
+        return offline_user
+
+    # then the shared redis cache
+    cached_user = await read_cached_user(token)
+    if cached_user is not None:
+        set_local_user(token, cached_user)
+        return cached_user
+
+    # fallback auth service call, coalesced per token
+    user_data = await validate_token_coalesced(token)
+    set_local_user(token, user_data)
+
     return user_data
\ No newline at end of file
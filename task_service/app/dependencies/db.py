@@ -1,8 +1,15 @@
-from app.core.database import SessionLocal
+from fastapi import Depends
 
-def get_db():
-    db = SessionLocal()
-    try:
+from app.core.sharding import shard_map
+from app.dependencies.auth import get_current_user
+
+async def get_db(current_user: dict = Depends(get_current_user)):
+    # session on the caller's shard; services never see which one it is
+    async with await shard_map.session_for(current_user["auth_user_id"]) as db:
+        yield db
+
+
+async def get_read_db(current_user: dict = Depends(get_current_user)):
+    # GET routes only: may be a replica, never one behind the caller's own writes
+    async with await shard_map.read_session_for(current_user["auth_user_id"]) as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
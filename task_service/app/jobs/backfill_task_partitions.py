@@ -0,0 +1,91 @@
+'''
+Copy existing `tasks` rows into `tasks_partitioned` (step 2 of the
+partitioning migration, see revision 0a6d5e2f9c31).
+
+    python -m app.jobs.backfill_task_partitions
+    python -m app.jobs.backfill_task_partitions --start-id 4200000 --batch-size 2000 --pause 0.1
+    python -m app.jobs.backfill_task_partitions --verify
+
+Rows are copied in id ranges, one short transaction per range. Rows written
+after the shadow table was created are mirrored by the trigger, so ON CONFLICT
+DO NOTHING keeps their newer copy. Source rows are read FOR SHARE: a concurrent
+delete either commits first (and the row is skipped) or waits for the batch,
+after which the trigger removes the copy. Safe to stop and rerun at any point;
+`--start-id` just skips ranges already done.
+'''
+import argparse
+import asyncio
+
+from sqlalchemy import text
+
+from app.core.sharding import shard_map
+
+COPY_BATCH = text(
+    """
+    WITH source AS (
+        SELECT id, auth_user_id, title, description, status, created_at, version
+        FROM tasks
+        WHERE id > :low AND id <= :high
+        FOR SHARE
+    )
+    INSERT INTO tasks_partitioned (id, auth_user_id, title, description, status, created_at, version)
+    SELECT id, auth_user_id, title, description, status, created_at, version FROM source
+    ON CONFLICT (id, auth_user_id) DO NOTHING
+    """
+)
+
+# rows of `tasks` without a copy, by primary key (runs against the live tables)
+MISSING_ROWS = text(
+    """
+    SELECT count(*) FROM tasks t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM tasks_partitioned p WHERE p.id = t.id AND p.auth_user_id = t.auth_user_id
+    )
+    """
+)
+
+
+async def backfill(shard: str, start_id: int, batch_size: int, pause: float):
+    async with shard_map.sessionmakers[shard]() as db:
+        # anything above this was inserted after the trigger existed
+        max_id = await db.scalar(text("SELECT coalesce(max(id), 0) FROM tasks"))
+
+        low = start_id
+        while low < max_id:
+            high = min(low + batch_size, max_id)
+            result = await db.execute(COPY_BATCH, {"low": low, "high": high})
+            await db.commit()
+            print(f"[{shard}] ids ({low}, {high}]: copied {result.rowcount}")
+            low = high
+            # throttle so replication and vacuum keep up
+            await asyncio.sleep(pause)
+
+
+async def verify(shard: str):
+    async with shard_map.sessionmakers[shard]() as db:
+        missing = await db.scalar(MISSING_ROWS)
+    print(f"[{shard}] rows missing from tasks_partitioned: {missing}")
+    return missing
+
+
+async def main(args):
+    # every shard is migrated the same way, one after the other
+    shards = [args.shard] if args.shard else list(shard_map.sessionmakers)
+    try:
+        if args.verify:
+            missing = [await verify(shard) for shard in shards]
+            raise SystemExit(1 if any(missing) else 0)
+        for shard in shards:
+            await backfill(shard, args.start_id, args.batch_size, args.pause)
+    finally:
+        await shard_map.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy tasks into the hash-partitioned shadow table")
+    parser.add_argument("--shard", default=None, help="only this shard (default: all of them)")
+    parser.add_argument("--start-id", type=int, default=0, help="resume after this task id")
+    parser.add_argument("--batch-size", type=int, default=5000, help="task ids per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between batches")
+    parser.add_argument("--verify", action="store_true", help="only report rows that still lack a copy")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,208 @@
+'''
+Move one user's tasks to another shard while the service keeps running.
+
+    python -m app.jobs.move_user_shard --user 42 --to shard_b
+    python -m app.jobs.move_user_shard --user 42 --to shard_b --batch-size 500 --drain-seconds 10
+
+1. pin the user to their current shard (`task_shard_overrides`)
+2. bulk copy their tasks to the target, batch by batch, while they keep working
+3. freeze the user (their task requests get 503), wait until every worker has
+   seen the flag and in-flight requests are done
+4. final pass: copy rows changed since step 2, drop rows deleted since, copy
+   the counters and move the target's id sequence past the copied ids
+5. point the override at the target (or drop it if that is the ring home) and
+   unfreeze; then delete the old copy in chunks
+
+Users with a task purge queued (before the copy, or by the time they are
+frozen) are not moved. Only step 3-5 blocks the user, typically for a few
+seconds. If anything fails before step 5 the user is unfrozen on the source
+shard and the partial copy on the target is harmless: rerunning the tool
+overwrites it.
+'''
+import argparse
+import asyncio
+
+from sqlalchemy import select, delete, text, tuple_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.sharding import shard_map
+from app.core.task_list_cache import bump_task_list_generation
+from app.models.task import Task
+from app.models.task_stats import TaskStats
+from app.models.task_purge_job import TaskPurgeJob
+from app.models.task_shard_override import TaskShardOverride
+
+tasks_table = Task.__table__
+MUTABLE_COLUMNS = ("title", "description", "status", "created_at", "version")
+
+
+async def set_override(auth_user_id: int, shard: str, frozen: bool):
+    stmt = pg_insert(TaskShardOverride).values(auth_user_id=auth_user_id, shard=shard, frozen=frozen)
+    async with SessionLocal() as db:
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskShardOverride.auth_user_id],
+                set_={"shard": stmt.excluded.shard, "frozen": stmt.excluded.frozen, "updated_at": func.now()},
+            )
+        )
+        await db.commit()
+
+
+async def clear_override(auth_user_id: int):
+    async with SessionLocal() as db:
+        await db.execute(delete(TaskShardOverride).where(TaskShardOverride.auth_user_id == auth_user_id))
+        await db.commit()
+
+
+async def copy_tasks(src, dst, auth_user_id: int, batch_size: int, pause: float) -> set[int]:
+    '''Upsert every task of the user from `src` into `dst`; returns the ids seen on `src`.'''
+    seen: set[int] = set()
+    last = None
+    while True:
+        # keyset walk over the per-user (created_at, id) index
+        query = select(tasks_table).where(tasks_table.c.auth_user_id == auth_user_id)
+        if last is not None:
+            query = query.where(tuple_(tasks_table.c.created_at, tasks_table.c.id) > last)
+        rows = (await src.execute(
+            query.order_by(tasks_table.c.created_at, tasks_table.c.id).limit(batch_size)
+        )).mappings().all()
+        await src.commit()
+        if not rows:
+            return seen
+
+        stmt = pg_insert(tasks_table).values([dict(row) for row in rows])
+        await dst.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id", "auth_user_id"],
+                set_={column: stmt.excluded[column] for column in MUTABLE_COLUMNS},
+                # every write bumps version, so equal versions are already in sync
+                where=tasks_table.c.version != stmt.excluded.version,
+            )
+        )
+        await dst.commit()
+
+        seen.update(row["id"] for row in rows)
+        last = (rows[-1]["created_at"], rows[-1]["id"])
+        await asyncio.sleep(pause)
+
+
+async def delete_ids(db, auth_user_id: int, task_ids: list[int], batch_size: int, pause: float):
+    for start in range(0, len(task_ids), batch_size):
+        await db.execute(
+            delete(Task).where(Task.auth_user_id == auth_user_id, Task.id.in_(task_ids[start:start + batch_size]))
+        )
+        await db.commit()
+        await asyncio.sleep(pause)
+
+
+async def finish_copy(src, dst, auth_user_id: int, source_ids: set[int], batch_size: int):
+    # rows deleted on the source since the bulk copy
+    target_ids = set((await dst.scalars(select(Task.id).where(Task.auth_user_id == auth_user_id))).all())
+    await delete_ids(dst, auth_user_id, sorted(target_ids - source_ids), batch_size, 0)
+
+    stats = await src.get(TaskStats, auth_user_id)
+    if stats is not None:
+        stmt = pg_insert(TaskStats).values(
+            auth_user_id=auth_user_id,
+            pending_count=stats.pending_count,
+            completed_count=stats.completed_count,
+            # carried over, or a list ETag from before the move could match again
+            change_count=stats.change_count + 1,
+        )
+        await dst.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskStats.auth_user_id],
+                set_={
+                    "pending_count": stmt.excluded.pending_count,
+                    "completed_count": stmt.excluded.completed_count,
+                    "change_count": stmt.excluded.change_count,
+                },
+            )
+        )
+
+    if source_ids:
+        # new tasks of this user on the target must not reuse a copied id
+        await dst.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('tasks', 'id'), "
+                "GREATEST(:max_id, nextval(pg_get_serial_sequence('tasks', 'id'))))"
+            ),
+            {"max_id": max(source_ids)},
+        )
+    await dst.commit()
+
+
+async def purge_pending(db, auth_user_id: int) -> bool:
+    pending = await db.scalar(
+        select(TaskPurgeJob.auth_user_id)
+        .where(TaskPurgeJob.auth_user_id == auth_user_id, TaskPurgeJob.completed_at.is_(None))
+    )
+    await db.commit()
+    return pending is not None
+
+
+async def move(auth_user_id: int, target: str, batch_size: int, pause: float, drain_seconds: float):
+    if target not in shard_map.sessionmakers:
+        raise SystemExit(f"unknown shard {target!r}; configured: {', '.join(sorted(shard_map.sessionmakers))}")
+
+    source, frozen = await shard_map.resolve(auth_user_id)
+    if frozen:
+        raise SystemExit(f"user {auth_user_id} is frozen; another move is running or was interrupted")
+    if source == target:
+        print(f"user {auth_user_id} already lives on {target}")
+        return
+
+    async with shard_map.sessionmakers[source]() as src, shard_map.sessionmakers[target]() as dst:
+        if await purge_pending(src, auth_user_id):
+            raise SystemExit(f"user {auth_user_id} has a task purge in progress; move them after it finishes")
+
+        await set_override(auth_user_id, source, frozen=False)
+        copied = await copy_tasks(src, dst, auth_user_id, batch_size, pause)
+        print(f"bulk copied {len(copied)} tasks {source} -> {target}")
+
+        await set_override(auth_user_id, source, frozen=True)
+        try:
+            # cached override entries expire, in-flight requests finish
+            await asyncio.sleep(settings.TASK_SHARD_OVERRIDE_CACHE_SECONDS + drain_seconds)
+            # a user deletion may have queued a purge during the bulk copy; its
+            # job row lives on the source and would be dropped by the move
+            if await purge_pending(src, auth_user_id):
+                # the user is gone: the bulk copy must not outlive the purge
+                await delete_ids(dst, auth_user_id, sorted(copied), batch_size, 0)
+                raise SystemExit(f"user {auth_user_id} got a task purge queued during the copy; move them after it finishes")
+            source_ids = await copy_tasks(src, dst, auth_user_id, batch_size, 0)
+            await finish_copy(src, dst, auth_user_id, source_ids, batch_size)
+        except BaseException:
+            await set_override(auth_user_id, source, frozen=False)
+            raise
+
+        if target == shard_map.home_shard(auth_user_id):
+            await clear_override(auth_user_id)
+        else:
+            await set_override(auth_user_id, target, frozen=False)
+        await bump_task_list_generation(auth_user_id)
+        print(f"user {auth_user_id} now served from {target}")
+
+        await delete_ids(src, auth_user_id, sorted(source_ids), batch_size, pause)
+        await src.execute(delete(TaskStats).where(TaskStats.auth_user_id == auth_user_id))
+        await src.commit()
+        print(f"removed {len(source_ids)} tasks from {source}")
+
+
+async def main(args):
+    try:
+        await move(args.user, args.to, args.batch_size, args.pause, args.drain_seconds)
+    finally:
+        await shard_map.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move a user's tasks to another shard online")
+    parser.add_argument("--user", type=int, required=True, help="auth user id to move")
+    parser.add_argument("--to", required=True, help="target shard name (a TASK_SHARDS key)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="tasks per copy/delete transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between batches")
+    parser.add_argument("--drain-seconds", type=float, default=5.0, help="extra wait for in-flight requests after freezing")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+'''
+Change the set of task shards without stranding anyone's tasks. This is the
+only supported way to add, remove or rename a TASK_SHARDS entry.
+
+Changing the shard names changes the hash-ring home of some users (~1/N
+when adding a shard). Their tasks stay where they are, so they must be pinned
+there before the new config goes live and moved afterwards:
+
+    # 1. with the CURRENT config deployed: pin every user whose home changes
+    python -m app.jobs.rebalance_shards pin --new-shards a,b,c
+
+    # 2. deploy the new TASK_SHARDS (every worker and job)
+
+    # 3. with the NEW config: move pinned users to their new home, which
+    #    also drops their override
+    python -m app.jobs.rebalance_shards move
+
+`pin` is idempotent. Rerun it right before deploying to catch users who wrote
+their first task after the first run.
+'''
+import argparse
+import asyncio
+
+from sqlalchemy import select, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.sharding import HashRing, shard_map
+from app.jobs.move_user_shard import move
+from app.models.task import Task
+from app.models.task_stats import TaskStats
+from app.models.task_purge_job import TaskPurgeJob
+from app.models.task_shard_override import TaskShardOverride
+
+
+async def users_on_shard(shard: str) -> set[int]:
+    async with shard_map.sessionmakers[shard]() as db:
+        return set((await db.scalars(
+            union(select(Task.auth_user_id), select(TaskStats.auth_user_id), select(TaskPurgeJob.auth_user_id))
+        )).all())
+
+
+async def pin(new_shards: list[str]):
+    new_ring = HashRing(sorted(new_shards), settings.TASK_SHARD_VNODES)
+
+    async with SessionLocal() as db:
+        overridden = set((await db.scalars(select(TaskShardOverride.auth_user_id))).all())
+
+    pinned = 0
+    for shard in shard_map.sessionmakers:
+        for auth_user_id in sorted(await users_on_shard(shard)):
+            if auth_user_id in overridden:
+                # already pinned explicitly; the override wins under any ring
+                continue
+
+            old_home = shard_map.home_shard(auth_user_id)
+            new_home = new_ring.node_for(str(auth_user_id))
+            if new_home == shard:
+                continue
+            if old_home != shard:
+                print(f"warning: user {auth_user_id} has rows on {shard} but its home is {old_home}; pinning to {shard}")
+
+            async with SessionLocal() as db:
+                await db.execute(
+                    pg_insert(TaskShardOverride)
+                    .values(auth_user_id=auth_user_id, shard=shard, frozen=False)
+                    .on_conflict_do_nothing()
+                )
+                await db.commit()
+            overridden.add(auth_user_id)
+            pinned += 1
+            print(f"user {auth_user_id}: pinned to {shard} (new home {new_home})")
+
+    print(f"pinned {pinned} users")
+
+
+async def move_pinned(batch_size: int, pause: float, drain_seconds: float):
+    async with SessionLocal() as db:
+        overrides = (await db.execute(
+            select(TaskShardOverride.auth_user_id, TaskShardOverride.shard)
+            .where(TaskShardOverride.frozen.is_(False))
+            .order_by(TaskShardOverride.auth_user_id)
+        )).all()
+
+    for auth_user_id, shard in overrides:
+        home = shard_map.home_shard(auth_user_id)
+        if shard == home:
+            continue
+        if shard not in shard_map.sessionmakers:
+            print(f"user {auth_user_id}: pinned to unknown shard {shard!r}; add it back to TASK_SHARDS first")
+            continue
+        try:
+            await move(auth_user_id, home, batch_size, pause, drain_seconds)
+        except SystemExit as exc:
+            # e.g. a purge in progress; the override keeps them served, rerun later
+            print(f"user {auth_user_id}: skipped: {exc}")
+
+
+async def main(args):
+    try:
+        if args.command == "pin":
+            await pin([name.strip() for name in args.new_shards.split(",") if name.strip()])
+        else:
+            await move_pinned(args.batch_size, args.pause, args.drain_seconds)
+    finally:
+        await shard_map.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pin and move users around a change of TASK_SHARDS")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pin_parser = commands.add_parser("pin", help="before the config change: pin users whose ring home changes")
+    pin_parser.add_argument("--new-shards", required=True, help="comma separated shard names of the new TASK_SHARDS")
+    move_parser = commands.add_parser("move", help="after the config change: move pinned users to their new home")
+    move_parser.add_argument("--batch-size", type=int, default=1000, help="tasks per copy/delete transaction")
+    move_parser.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between batches")
+    move_parser.add_argument("--drain-seconds", type=float, default=5.0, help="extra wait for in-flight requests after freezing")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+'''
+Recompute `task_stats` from `tasks`.
+
+    python -m app.jobs.repair_task_stats             # every user
+    python -m app.jobs.repair_task_stats --user 42   # one user
+
+Counters are normally kept exact by TaskService; this fixes drift from writes
+that bypassed it (manual SQL, restores, the seeding migration racing traffic).
+Safe to run against live traffic: each user's counter row is locked before
+their tasks are counted, so a concurrent write either commits before the count
+(and is included) or waits and applies its delta on top of the repaired value.
+'''
+import argparse
+import asyncio
+
+from sqlalchemy import select, union, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.sharding import shard_map
+from app.models.task import Task
+from app.models.task_stats import TaskStats
+
+
+async def repair_user(db, auth_user_id: int) -> tuple[int, int]:
+    # make sure there is a row to lock, then hold it while counting
+    await db.execute(
+        pg_insert(TaskStats).values(auth_user_id=auth_user_id).on_conflict_do_nothing()
+    )
+    await db.execute(select(TaskStats.auth_user_id).where(TaskStats.auth_user_id == auth_user_id).with_for_update())
+
+    pending, completed = (await db.execute(
+        select(
+            func.count().filter(Task.status == "pending"),
+            func.count().filter(Task.status == "completed"),
+        ).where(Task.auth_user_id == auth_user_id)
+    )).one()
+
+    stats = await db.get(TaskStats, auth_user_id, populate_existing=True)
+    stats.pending_count = pending
+    stats.completed_count = completed
+    await db.commit()
+    return pending, completed
+
+
+async def repair_shard(shard: str, user_id: int | None = None):
+    async with shard_map.sessionmakers[shard]() as db:
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = (await db.scalars(
+                union(select(Task.auth_user_id), select(TaskStats.auth_user_id))
+            )).all()
+
+        # one short transaction per user keeps lock hold times tiny
+        for auth_user_id in user_ids:
+            pending, completed = await repair_user(db, auth_user_id)
+            print(f"[{shard}] user {auth_user_id}: pending={pending} completed={completed}")
+
+
+async def repair(user_id: int | None = None):
+    try:
+        if user_id is not None:
+            shard, _ = await shard_map.resolve(user_id)
+            await repair_shard(shard, user_id)
+        else:
+            for shard in shard_map.sessionmakers:
+                await repair_shard(shard)
+    finally:
+        await shard_map.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute per-user task counters from the tasks table")
+    parser.add_argument("--user", type=int, default=None, help="only repair this auth user id")
+    args = parser.parse_args()
+    asyncio.run(repair(args.user))
@@ -1,11 +1,37 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.exceptions import RequestValidationError
 
 from app.core.responses import error_response
 from app.core.config import settings
+from app.core.jwks import jwks_cache
+from app.core.token_cache import token_invalidation_listener
+from app.core.task_events import task_event_broker
+from app.core.task_purge import task_purge_worker
+from app.core.sharding import shard_map
 from app.routers import task
 
-app = FastAPI(title=settings.APP_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await jwks_cache.start()
+    shard_map.start()
+    token_invalidation_listener.start()
+    task_event_broker.start()
+    if settings.TASK_PURGE_WORKER_ENABLED:
+        task_purge_worker.start()
+    try:
+        yield
+    finally:
+        await task_purge_worker.stop()
+        await task_event_broker.stop()
+        await token_invalidation_listener.stop()
+        await jwks_cache.stop()
+        await shard_map.dispose()
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.include_router(task.router)
 
@@ -18,6 +18,9 @@ from alembic import context
 
 from app.core.database import Base
 from app.models.task import Task
+from app.models.task_stats import TaskStats
+from app.models.task_purge_job import TaskPurgeJob
+from app.models.task_shard_override import TaskShardOverride
 
 
 
@@ -25,7 +28,8 @@ from app.models.task import Task
 # access to the values within the .ini file in use.
 config = context.config
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+# every task shard carries the same schema: `alembic -x database_url=<shard url> upgrade head`
+DATABASE_URL = context.get_x_argument(as_dictionary=True).get("database_url") or os.getenv("DATABASE_URL")
 
 if DATABASE_URL:
     config.set_main_option(name = "sqlalchemy.url", value=DATABASE_URL)
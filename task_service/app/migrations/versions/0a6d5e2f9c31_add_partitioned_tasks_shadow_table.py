@@ -0,0 +1,108 @@
+"""Add hash-partitioned tasks shadow table
+
+Step 1 of 3 of moving `tasks` to a table hash-partitioned on auth_user_id:
+
+  1. this revision: create `tasks_partitioned` and a trigger on `tasks` that
+     mirrors every insert/update/delete into it from now on
+  2. `python -m app.jobs.backfill_task_partitions` copies the existing rows
+     in small batches while the service keeps running
+  3. revision 8e1b47c3d2a6 swaps the two tables under a short lock
+
+On an existing database stop at this revision (`alembic upgrade 0a6d5e2f9c31`),
+run the backfill, then `alembic upgrade head`.
+
+Revision ID: 0a6d5e2f9c31
+Revises: b3f60c8e2a14
+Create Date: 2026-10-18 17:02:19.604871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d5e2f9c31'
+down_revision: Union[str, Sequence[str], None] = 'b3f60c8e2a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# fixed for the life of the table; changing it means another repartitioning
+PARTITION_COUNT = 16
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE TABLE tasks_partitioned (
+            id integer NOT NULL DEFAULT nextval('tasks_id_seq'),
+            auth_user_id integer NOT NULL,
+            title varchar NOT NULL,
+            description text,
+            status varchar,
+            created_at timestamptz DEFAULT now(),
+            version integer NOT NULL DEFAULT 1,
+            CONSTRAINT tasks_partitioned_pkey PRIMARY KEY (id, auth_user_id)
+        ) PARTITION BY HASH (auth_user_id)
+        """
+    )
+    for remainder in range(PARTITION_COUNT):
+        op.execute(
+            f"CREATE TABLE tasks_p{remainder:02d} PARTITION OF tasks_partitioned "
+            f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})"
+        )
+
+    # created on the (still empty) parent, so every partition gets them cheaply
+    op.create_index('ix_tasks_partitioned_id', 'tasks_partitioned', ['id'], unique=False)
+    op.create_index(
+        'ix_tasks_partitioned_auth_user_id_created_at_id',
+        'tasks_partitioned',
+        ['auth_user_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_tasks_partitioned_auth_user_id_pending',
+        'tasks_partitioned',
+        ['auth_user_id', 'created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+    op.execute(
+        """
+        CREATE FUNCTION tasks_mirror_to_partitioned() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.auth_user_id <> NEW.auth_user_id) THEN
+                DELETE FROM tasks_partitioned WHERE id = OLD.id AND auth_user_id = OLD.auth_user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO tasks_partitioned (id, auth_user_id, title, description, status, created_at, version)
+                VALUES (NEW.id, NEW.auth_user_id, NEW.title, NEW.description, NEW.status, NEW.created_at, NEW.version)
+                ON CONFLICT (id, auth_user_id) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    status = EXCLUDED.status,
+                    created_at = EXCLUDED.created_at,
+                    version = EXCLUDED.version;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_mirror_to_partitioned
+        AFTER INSERT OR UPDATE OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_mirror_to_partitioned()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tasks_mirror_to_partitioned ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS tasks_mirror_to_partitioned()")
+    op.drop_table('tasks_partitioned')
@@ -0,0 +1,35 @@
+"""Add task shard overrides table
+
+Revision ID: 5b9c2e7a4f18
+Revises: 8e1b47c3d2a6
+Create Date: 2026-10-18 17:48:03.771245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9c2e7a4f18'
+down_revision: Union[str, Sequence[str], None] = '8e1b47c3d2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # only read from the DATABASE_URL (directory) database; empty elsewhere
+    op.create_table('task_shard_overrides',
+    sa.Column('auth_user_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(), nullable=False),
+    sa.Column('frozen', sa.Boolean(), server_default='false', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('auth_user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_shard_overrides')
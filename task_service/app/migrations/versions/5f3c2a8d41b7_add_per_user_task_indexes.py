@@ -0,0 +1,48 @@
+"""Add per-user task indexes
+
+Revision ID: 5f3c2a8d41b7
+Revises: 92182602e517
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3c2a8d41b7'
+down_revision: Union[str, Sequence[str], None] = '92182602e517'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY can not run inside a transaction; building the
+    # indexes this way keeps `tasks` writable while they are created.
+    # A failed concurrent build leaves an INVALID index behind: drop it and rerun.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_auth_user_id_created_at_id',
+            'tasks',
+            ['auth_user_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_auth_user_id_pending',
+            'tasks',
+            ['auth_user_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_auth_user_id_pending', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_auth_user_id_created_at_id', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,32 @@
+"""Add task stats change count
+
+Revision ID: 7d2e9a4c1b85
+Revises: 5b9c2e7a4f18
+Create Date: 2026-10-18 19:06:27.418930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e9a4c1b85'
+down_revision: Union[str, Sequence[str], None] = '5b9c2e7a4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # constant default: catalog-only change, no table rewrite
+    op.add_column(
+        'task_stats',
+        sa.Column('change_count', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('task_stats', 'change_count')
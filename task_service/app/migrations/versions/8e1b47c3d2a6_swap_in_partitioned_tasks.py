@@ -0,0 +1,121 @@
+"""Swap in the hash-partitioned tasks table
+
+Step 3 of 3 (see 0a6d5e2f9c31). Run only after
+`python -m app.jobs.backfill_task_partitions --verify` reports nothing
+missing. The row counts are compared once more without blocking writes: the
+trigger mirrors every write in the writer's own transaction, so one snapshot
+sees both tables in sync or not at all. Only the trigger drop and the renames
+run under ACCESS EXCLUSIVE, and waiting for that lock gives up after
+LOCK_TIMEOUT (rerun the migration) instead of queueing every task query
+behind it. The old table is kept as `tasks_unpartitioned` until it is
+dropped by hand.
+
+Revision ID: 8e1b47c3d2a6
+Revises: 0a6d5e2f9c31
+Create Date: 2026-10-18 17:20:44.118392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e1b47c3d2a6'
+down_revision: Union[str, Sequence[str], None] = '0a6d5e2f9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# how long the swap may wait for ACCESS EXCLUSIVE while blocking other queries
+LOCK_TIMEOUT = "3s"
+
+INDEX_RENAMES = [
+    # (unpartitioned name, partitioned name while shadowing)
+    ('tasks_pkey', 'tasks_partitioned_pkey'),
+    ('ix_tasks_id', 'ix_tasks_partitioned_id'),
+    ('ix_tasks_auth_user_id_created_at_id', 'ix_tasks_partitioned_auth_user_id_created_at_id'),
+    ('ix_tasks_auth_user_id_pending', 'ix_tasks_partitioned_auth_user_id_pending'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # both counts in one expression, hence one snapshot; writers are not blocked
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF (SELECT count(*) FROM tasks) <> (SELECT count(*) FROM tasks_partitioned) THEN
+                RAISE EXCEPTION 'tasks_partitioned is not in sync with tasks; run app.jobs.backfill_task_partitions first';
+            END IF;
+        END
+        $$
+        """
+    )
+
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute("LOCK TABLE tasks, tasks_partitioned IN ACCESS EXCLUSIVE MODE")
+    op.execute("DROP TRIGGER tasks_mirror_to_partitioned ON tasks")
+    op.execute("DROP FUNCTION tasks_mirror_to_partitioned()")
+
+    op.execute("ALTER TABLE tasks RENAME TO tasks_unpartitioned")
+    for name, shadow_name in INDEX_RENAMES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name.replace('tasks', 'tasks_unpartitioned', 1)}")
+        op.execute(f"ALTER INDEX {shadow_name} RENAME TO {name}")
+    op.execute("ALTER TABLE tasks_partitioned RENAME TO tasks")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("ALTER TABLE tasks_unpartitioned ALTER COLUMN id DROP DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # holds the lock for a full copy back: plan downtime for a downgrade
+    op.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    # bring the old heap up to date with whatever was written since the swap
+    op.execute("TRUNCATE tasks_unpartitioned")
+    op.execute(
+        """
+        INSERT INTO tasks_unpartitioned (id, auth_user_id, title, description, status, created_at, version)
+        SELECT id, auth_user_id, title, description, status, created_at, version FROM tasks
+        """
+    )
+    op.execute("ALTER TABLE tasks_unpartitioned ALTER COLUMN id SET DEFAULT nextval('tasks_id_seq')")
+
+    op.execute("ALTER TABLE tasks RENAME TO tasks_partitioned")
+    for name, shadow_name in INDEX_RENAMES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {shadow_name}")
+        op.execute(f"ALTER INDEX {name.replace('tasks', 'tasks_unpartitioned', 1)} RENAME TO {name}")
+    op.execute("ALTER TABLE tasks_unpartitioned RENAME TO tasks")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+
+    # resume mirroring so the swap can be re-applied later
+    op.execute(
+        """
+        CREATE FUNCTION tasks_mirror_to_partitioned() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.auth_user_id <> NEW.auth_user_id) THEN
+                DELETE FROM tasks_partitioned WHERE id = OLD.id AND auth_user_id = OLD.auth_user_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO tasks_partitioned (id, auth_user_id, title, description, status, created_at, version)
+                VALUES (NEW.id, NEW.auth_user_id, NEW.title, NEW.description, NEW.status, NEW.created_at, NEW.version)
+                ON CONFLICT (id, auth_user_id) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    status = EXCLUDED.status,
+                    created_at = EXCLUDED.created_at,
+                    version = EXCLUDED.version;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_mirror_to_partitioned
+        AFTER INSERT OR UPDATE OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_mirror_to_partitioned()
+        """
+    )
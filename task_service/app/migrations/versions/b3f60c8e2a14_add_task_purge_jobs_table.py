@@ -0,0 +1,37 @@
+"""Add task purge jobs table
+
+Revision ID: b3f60c8e2a14
+Revises: e4a7d19b3c56
+Create Date: 2026-10-18 16:31:40.227305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f60c8e2a14'
+down_revision: Union[str, Sequence[str], None] = 'e4a7d19b3c56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_purge_jobs',
+    sa.Column('auth_user_id', sa.Integer(), nullable=False),
+    sa.Column('purge_before', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('source_event_id', sa.String(), nullable=False),
+    sa.Column('deleted_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('auth_user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_purge_jobs')
@@ -0,0 +1,29 @@
+"""Add task version column
+
+Revision ID: c81e4b7f2d90
+Revises: 5f3c2a8d41b7
+Create Date: 2026-10-18 14:40:07.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81e4b7f2d90'
+down_revision: Union[str, Sequence[str], None] = '5f3c2a8d41b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # a constant server default makes this a catalog-only change (no table rewrite)
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tasks', 'version')
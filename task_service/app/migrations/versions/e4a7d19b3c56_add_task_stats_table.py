@@ -0,0 +1,47 @@
+"""Add task stats table
+
+Revision ID: e4a7d19b3c56
+Revises: c81e4b7f2d90
+Create Date: 2026-10-18 15:22:48.906114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7d19b3c56'
+down_revision: Union[str, Sequence[str], None] = 'c81e4b7f2d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_stats',
+        sa.Column('auth_user_id', sa.Integer(), nullable=False),
+        sa.Column('pending_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('auth_user_id'),
+    )
+    # seed from existing tasks; writes that race the migration are fixed by
+    # `python -m app.jobs.repair_task_stats`
+    op.execute(
+        """
+        INSERT INTO task_stats (auth_user_id, pending_count, completed_count)
+        SELECT auth_user_id,
+               count(*) FILTER (WHERE status = 'pending'),
+               count(*) FILTER (WHERE status = 'completed')
+        FROM tasks
+        GROUP BY auth_user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('task_stats')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, text
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -7,9 +7,27 @@ from app.core.database import Base
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(Integer, primary_key=True, index=True)
-    auth_user_id = Column(Integer, nullable=False)
+    # a composite key gets no implicit SERIAL, so name the sequence the
+    # partitioned table took over from the original one (see 0a6d5e2f9c31)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True, server_default=text("nextval('tasks_id_seq')"))
+    # part of the key because `tasks` is hash-partitioned on it: every per-user
+    # query filters on auth_user_id, so Postgres reads exactly one partition
+    auth_user_id = Column(Integer, primary_key=True, nullable=False)
     title = Column(String, nullable = False)
     description = Column(Text)
     status = Column(String, default = "pending")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # bumped by every write; drives ETags and If-Match checks
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __table_args__ = (
+        # per-user listings and ownership checks (keyset order: created_at, id)
+        Index("ix_tasks_auth_user_id_created_at_id", "auth_user_id", "created_at", "id"),
+        Index(
+            "ix_tasks_auth_user_id_pending",
+            "auth_user_id", "created_at", "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # partitions themselves are created by migrations (see 0a6d5e2f9c31)
+        {"postgresql_partition_by": "HASH (auth_user_id)"},
+    )
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class TaskPurgeJob(Base):
+    '''
+    Durable progress of deleting a user's tasks after their profile was removed.
+    Each purged chunk commits together with the `deleted_count` bump, so a
+    restarted worker resumes exactly where the last one stopped.
+    '''
+    __tablename__ = "task_purge_jobs"
+
+    auth_user_id = Column(Integer, primary_key=True)
+    # tasks created after the deletion request are left alone
+    purge_before = Column(DateTime(timezone=True), nullable=False)
+    source_event_id = Column(String, nullable=False)
+    deleted_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True))
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class TaskShardOverride(Base):
+    '''
+    Users pinned to a shard other than their hash-ring home (or frozen while
+    `app.jobs.move_user_shard` moves them). Lives in the DATABASE_URL database.
+    '''
+    __tablename__ = "task_shard_overrides"
+
+    auth_user_id = Column(Integer, primary_key=True)
+    shard = Column(String, nullable=False)
+    # requests for the user are refused while their tasks are being moved
+    frozen = Column(Boolean, nullable=False, default=False, server_default="false")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class TaskStats(Base):
+    '''
+    Per-user task counters, adjusted by TaskService in the same transaction as
+    the task write so `GET /tasks/stats` is one primary-key lookup.
+    `change_count` goes up by one on every write and versions the list ETags.
+    '''
+    __tablename__ = "task_stats"
+
+    auth_user_id = Column(Integer, primary_key=True)
+    pending_count = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    change_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
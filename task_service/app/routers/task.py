@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Literal
 
-from app.dependencies.db import get_db
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sharding import shard_map
+from app.core.task_list_cache import get_cached_task_list, store_task_list, params_digest
+from app.core.etags import task_etag, list_etag, etag_matches, parse_if_match
+from app.core.task_events import stream_task_events
+from app.core.export import EXPORT_MEDIA_TYPES, ndjson_chunk, csv_header, csv_chunk
+from app.dependencies.db import get_db, get_read_db
 from app.dependencies.auth import get_current_user
-from app.core.responses import success_response
+from app.core.config import settings
+from app.core.responses import success_response, fast_success_response
 from app.schemas.task import (
     TaskCreateRequest,
     TaskUpdateRequest,
     TaskResponse,
+    TaskBulkCreateRequest,
+    TaskBulkUpdateRequest,
+    TaskBulkDeleteRequest,
+    TaskBulkItemResult,
 )
 from app.services.task_service import TaskService
 
@@ -17,44 +31,249 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
 async def task_create(
     payload: TaskCreateRequest,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = TaskService(db,current_user)
-    created_task = service.create_task(title = payload.title, description = payload.description)
+    created_task = await service.create_task(title = payload.title, description = payload.description)
     
-    return success_response(data = TaskResponse.model_validate(created_task).model_dump(mode="json")
+    response = success_response(data = TaskResponse.model_validate(created_task).model_dump(mode="json")
                             , message = "Task created successfully."
                             , status_code = status.HTTP_201_CREATED)
+    response.headers["ETag"] = task_etag(created_task.id, created_task.version)
+    return response
 
 
 @router.get("")
 async def list_tasks(
+    limit: int = Query(default=settings.TASK_PAGE_DEFAULT_LIMIT, ge=1, le=settings.TASK_PAGE_MAX_LIMIT),
+    cursor: str | None = None,
+    status_filter: str | None = Query(default=None, alias="status"),
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    order: Literal["desc", "asc"] = "desc",
+    if_none_match: str | None = Header(default=None),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
+    auth_user_id = current_user["auth_user_id"]
+    cache_params = {
+        "limit": limit,
+        "cursor": cursor,
+        "status": status_filter,
+        "created_after": created_after.isoformat() if created_after else None,
+        "created_before": created_before.isoformat() if created_before else None,
+        "order": order,
+    }
+    cached, generation = await get_cached_task_list(auth_user_id, cache_params)
+    if cached is not None:
+        etag, body = cached
+        if etag_matches(if_none_match, etag):
+            return Response(status_code = status.HTTP_304_NOT_MODIFIED, headers = {"ETag": etag})
+        return Response(content = body, media_type = "application/json", headers = {"ETag": etag})
+
     service = TaskService(db,current_user)
-    user_tasks = service.get_tasks()
+    filters = {"status_value": status_filter, "created_after": created_after, "created_before": created_before}
+    try:
+        # the user's change counter (one primary-key lookup) decides whether the client's copy is still good
+        etag = list_etag(*await service.list_fingerprint(), params_digest(cache_params))
+        if etag_matches(if_none_match, etag):
+            return Response(status_code = status.HTTP_304_NOT_MODIFIED, headers = {"ETag": etag})
+
+        user_tasks, next_cursor = await service.get_tasks(limit = limit, cursor = cursor, order = order, **filters)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
     
-    data = [TaskResponse.model_validate(i).model_dump(mode="json")  for i in user_tasks]
+    # plain rows straight into the encoder, same keys/order as TaskResponse
+    data = {
+        "items": [
+            {"id": task_id, "title": title, "description": description, "status": task_status}
+            for task_id, title, description, task_status, _ in user_tasks
+        ],
+        "next_cursor": next_cursor,
+    }
     
-    return success_response(data = data
+    response = fast_success_response(data = data
                             , message = "Tasks fetched successfully."
                             , status_code = status.HTTP_200_OK)
+    response.headers["ETag"] = etag
+    # a lagging replica could pin an old page under the current generation
+    if db.info.get("replica") is None:
+        await store_task_list(auth_user_id, generation, cache_params, etag, response.body)
+    return response
+
+
+@router.get("/export")
+async def task_export(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    status_filter: str | None = Query(default=None, alias="status"),
+    current_user: dict = Depends(get_current_user),
+):
+    if status_filter is not None and status_filter not in {"pending", "completed"}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid task status",
+        )
+
+    # opened here so a frozen shard is still a clean 503; connects lazily
+    db = await shard_map.read_session_for(current_user["auth_user_id"])
+
+    async def body():
+        # the session lives exactly as long as the stream, not the request scope
+        async with db:
+            service = TaskService(db,current_user)
+            if export_format == "csv":
+                yield csv_header()
+            async for rows in service.iter_task_rows(batch_size = settings.TASK_EXPORT_BATCH_SIZE, status_value = status_filter):
+                yield csv_chunk(rows) if export_format == "csv" else ndjson_chunk(rows)
+
+    return StreamingResponse(
+        body(),
+        media_type = EXPORT_MEDIA_TYPES[export_format],
+        headers = {"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+
+@router.get("/stream")
+async def task_stream(
+    current_user: dict = Depends(get_current_user),
+):
+    # no db session: an open stream holds nothing but a queue in this worker
+    return StreamingResponse(
+        stream_task_events(current_user["auth_user_id"]),
+        media_type = "text/event-stream",
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def task_stats(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    service = TaskService(db,current_user)
+    stats = await service.get_stats()
+
+    return success_response(data = stats
+                            , message = "Task stats fetched successfully."
+                            , status_code = status.HTTP_200_OK)
+
+
+def bulk_results_data(results: list[dict]) -> dict:
+    return {
+        "results": [
+            TaskBulkItemResult(
+                id = item["id"],
+                result = item["result"],
+                task = TaskResponse.model_validate(item["task"]) if item.get("task") is not None else None,
+                detail = item.get("detail"),
+            ).model_dump(mode="json")
+            for item in results
+        ]
+    }
+
+
+# bulk routes are registered before "/{task_id}" so "bulk" is not parsed as an id
+@router.post("/bulk")
+async def task_bulk_create(
+    payload: TaskBulkCreateRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    service = TaskService(db,current_user)
+    try:
+        results = await service.bulk_create_tasks([item.model_dump() for item in payload.tasks])
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
+
+    return success_response(data = bulk_results_data(results)
+                            , message = "Tasks created successfully."
+                            , status_code = status.HTTP_201_CREATED)
+
+
+@router.patch("/bulk")
+async def task_bulk_update(
+    payload: TaskBulkUpdateRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    service = TaskService(db,current_user)
+    try:
+        results = await service.bulk_update_tasks([item.model_dump() for item in payload.tasks])
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
+
+    return success_response(data = bulk_results_data(results)
+                            , message = "Tasks updated."
+                            , status_code = status.HTTP_200_OK)
+
+
+@router.delete("/bulk")
+async def task_bulk_delete(
+    payload: TaskBulkDeleteRequest,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    service = TaskService(db,current_user)
+    try:
+        results = await service.bulk_delete_tasks(payload.ids)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
+
+    return success_response(data = bulk_results_data(results)
+                            , message = "Tasks deleted."
+                            , status_code = status.HTTP_200_OK)
+
+
+@router.get("/{task_id}")
+async def task_detail(
+    task_id: int,
+    if_none_match: str | None = Header(default=None),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    service = TaskService(db,current_user)
+    task = await service.get_task_by_id(task_id = task_id)
+
+    etag = task_etag(task.id, task.version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code = status.HTTP_304_NOT_MODIFIED, headers = {"ETag": etag})
+
+    response = success_response(data = TaskResponse.model_validate(task).model_dump(mode="json")
+                            , message = "Task fetched successfully."
+                            , status_code = status.HTTP_200_OK)
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.put("/{task_id}")
 async def task_update(
     task_id: int,
     payload: TaskUpdateRequest,
+    if_match: str | None = Header(default=None),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = TaskService(db,current_user)
     try:
-        updated_task = service.update_task(task_id = task_id, title = payload.title, description = payload.description, status_value = payload.status)
-        return success_response(data = TaskResponse.model_validate(updated_task).model_dump(mode="json")
+        updated_task = await service.update_task(task_id = task_id, title = payload.title, description = payload.description, status_value = payload.status
+                                                 , expected_version = parse_if_match(if_match, task_id))
+        response = success_response(data = TaskResponse.model_validate(updated_task).model_dump(mode="json")
                             , message = "Task updated successfully."
                             , status_code = status.HTTP_200_OK)
+        response.headers["ETag"] = task_etag(updated_task.id, updated_task.version)
+        return response
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -65,10 +284,18 @@ async def task_update(
 @router.delete("/{task_id}")
 async def task_delete(
     task_id: int,
+    if_match: str | None = Header(default=None),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     service = TaskService(db,current_user)
-    service.delete_task(task_id = task_id)
+    try:
+        expected_version = parse_if_match(if_match, task_id)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        )
+    await service.delete_task(task_id = task_id, expected_version = expected_version)
     
     return success_response(message = "Task deleted successfully.", status_code = status.HTTP_200_OK)
\ No newline at end of file
@@ -18,4 +18,29 @@ class TaskResponse(BaseModel):
     description: str | None
     status: str
 
-    model_config = ConfigDict(from_attributes= True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes= True)
+
+
+class TaskBulkCreateRequest(BaseModel):
+    tasks: list[TaskCreateRequest]
+
+
+class TaskBulkUpdateItem(TaskUpdateRequest):
+    id: int
+    # optional optimistic-concurrency check, the version from the task ETag
+    version: int | None = None
+
+
+class TaskBulkUpdateRequest(BaseModel):
+    tasks: list[TaskBulkUpdateItem]
+
+
+class TaskBulkDeleteRequest(BaseModel):
+    ids: list[int]
+
+
+class TaskBulkItemResult(BaseModel):
+    id: int | None = None
+    result: str
+    task: TaskResponse | None = None
+    detail: str | None = None
\ No newline at end of file
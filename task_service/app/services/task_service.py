@@ -1,20 +1,183 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select, insert, update, delete, tuple_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.replicas import record_write
+from app.core.task_list_cache import bump_task_list_generation
+from app.core.task_events import publish_task_events, task_event, task_deleted_event
 from app.models.task import Task
+from app.models.task_stats import TaskStats
+from app.models.task_purge_job import TaskPurgeJob
 
 class TaskService:
     
-    def __init__(self, db: Session, current_user: dict):
+    def __init__(self, db: AsyncSession, current_user: dict):
         self.db = db
         self.current_user = current_user
         self.valid_status = {"pending", "completed"}
+
+    async def _commit(self, events: list[dict] | None = None):
+        # every write goes through here so cached listings are invalidated and
+        # change streams notified, both only once the write is durable
+        await self.db.commit()
+        await record_write(self.db, self.current_user["auth_user_id"])
+        await bump_task_list_generation(self.current_user["auth_user_id"])
+        await publish_task_events(self.current_user["auth_user_id"], events or [])
         
-    def get_tasks(self):
+    async def _adjust_stats(self, deltas: dict[str, int]):
+        '''
+        Move the user's status counters by `deltas` and bump their change count
+        inside the current transaction, so both commit or roll back together with
+        the task write. Every write calls this, even without a status change.
+        '''
+        pending = deltas.get("pending", 0)
+        completed = deltas.get("completed", 0)
+
+        stmt = pg_insert(TaskStats).values(
+            auth_user_id=self.current_user["auth_user_id"],
+            pending_count=pending,
+            completed_count=completed,
+            change_count=1,
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskStats.auth_user_id],
+                set_={
+                    "pending_count": TaskStats.pending_count + pending,
+                    "completed_count": TaskStats.completed_count + completed,
+                    "change_count": TaskStats.change_count + 1,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    @staticmethod
+    def _count_transition(deltas: dict[str, int], old_status: str | None, new_status: str | None):
+        if old_status == new_status:
+            return
+        if old_status is not None:
+            deltas[old_status] = deltas.get(old_status, 0) - 1
+        if new_status is not None:
+            deltas[new_status] = deltas.get(new_status, 0) + 1
+
+    async def get_stats(self) -> dict:
+        stats = await self.db.get(TaskStats, self.current_user["auth_user_id"])
+        pending = stats.pending_count if stats else 0
+        completed = stats.completed_count if stats else 0
+        return {"pending": pending, "completed": completed, "total": pending + completed}
+
+    def _filtered(
+        self,
+        query,
+        *,
+        status_value: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+    ):
+        query = query.where(Task.auth_user_id == self.current_user["auth_user_id"])
+        if status_value is not None:
+            if status_value not in self.valid_status:
+                raise ValueError("Invalid task status")
+            query = query.where(Task.status == status_value)
+        if created_after is not None:
+            query = query.where(Task.created_at >= created_after)
+        if created_before is not None:
+            query = query.where(Task.created_at < created_before)
+        return query
+
+    async def list_fingerprint(self) -> tuple[int, int]:
+        '''
+        (change count, task count) of the user. Every insert, update or delete
+        moves the change count in the same transaction, so together with the
+        query parameters it identifies any listing, from one primary-key lookup.
+        '''
+        row = (await self.db.execute(
+            select(TaskStats.change_count, TaskStats.pending_count + TaskStats.completed_count)
+            .where(TaskStats.auth_user_id == self.current_user["auth_user_id"])
+        )).one_or_none()
+        return tuple(row) if row is not None else (0, 0)
+
+    def list_statement(
+        self,
+        *,
+        limit: int,
+        cursor: str | None = None,
+        status_value: str | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        order: str = "desc",
+    ):
+        '''
+        SELECT for one page of the user's tasks ordered by (created_at, id).
+        Projects only the response columns (plus `created_at` for the cursor) as
+        plain rows, and fetches `limit + 1` of them so the caller can tell whether
+        a next page exists. Served by ix_tasks_auth_user_id_created_at_id (or the
+        pending partial index).
+        '''
+        query = self._filtered(
+            select(Task.id, Task.title, Task.description, Task.status, Task.created_at),
+            status_value=status_value,
+            created_after=created_after,
+            created_before=created_before,
+        )
+
+        sort_key = tuple_(Task.created_at, Task.id)
+        if cursor is not None:
+            after_created_at, after_id = decode_cursor(cursor, order)
+            boundary = tuple_(after_created_at, after_id)
+            query = query.where(sort_key < boundary if order == "desc" else sort_key > boundary)
+
+        if order == "desc":
+            query = query.order_by(Task.created_at.desc(), Task.id.desc())
+        else:
+            query = query.order_by(Task.created_at.asc(), Task.id.asc())
+
+        return query.limit(limit + 1)
+
+    async def get_tasks(self, *, limit: int, order: str = "desc", **filters) -> tuple[list, str | None]:
+        '''
+        One page of the user's tasks as (id, title, description, status, created_at)
+        rows plus the cursor of the next page (None on the last page). Keyset
+        pagination, so every page is a bounded index range scan however deep the
+        client has scrolled.
+        '''
+        result = await self.db.execute(self.list_statement(limit=limit, order=order, **filters))
+        tasks = result.all()
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            last = tasks[-1]
+            next_cursor = encode_cursor(last.created_at, last.id, order)
+
+        return tasks, next_cursor
+
+    async def iter_task_rows(self, *, batch_size: int, status_value: str | None = None) -> AsyncIterator[list]:
+        '''
+        Every task of the user as plain rows, `batch_size` at a time, read through a
+        server-side cursor so memory stays bounded whatever the task count.
+        '''
         auth_user_id = self.current_user["auth_user_id"]
-        return self.db.query(Task).filter(Task.auth_user_id == auth_user_id).all()
 
-    def create_task(self, title: str, description: str | None):
+        query = select(Task.id, Task.title, Task.description, Task.status, Task.created_at).where(
+            Task.auth_user_id == auth_user_id
+        )
+        if status_value is not None:
+            if status_value not in self.valid_status:
+                raise ValueError("Invalid task status")
+            query = query.where(Task.status == status_value)
+
+        result = await self.db.stream(query.order_by(Task.id).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def create_task(self, title: str, description: str | None):
         
         auth_user_id = self.current_user["auth_user_id"]
         
@@ -25,50 +188,328 @@ class TaskService:
         )
         
         self.db.add(task)    
-        self.db.commit()
-        self.db.refresh(task)
+        await self._adjust_stats({"pending": 1})
+        # assigns the id the change event needs
+        await self.db.flush()
+        await self._commit([task_event("created", task)])
+        await self.db.refresh(task)
         
         return task
 
 
-    def get_task_by_id(self, task_id: int) -> Task:
+    async def get_task_by_id(self, task_id: int) -> Task:
         
         auth_user_id = self.current_user["auth_user_id"]
         
-        task = self.db.query(Task).filter(Task.id == task_id).first()
+        # owner in the predicate so only the user's partition is read
+        task = await self.db.scalar(select(Task).where(Task.id == task_id, Task.auth_user_id == auth_user_id))
+        if task is not None:
+            return task
 
-        if not task:
+        # error path only: tell a foreign task from a missing one
+        owner = await self.db.scalar(select(Task.auth_user_id).where(Task.id == task_id))
+        if owner is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found",
             )
 
-        if task.auth_user_id != auth_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this task",
+        )
+
+    def _check_version(self, task: Task, expected_version: int | None):
+        if expected_version is not None and task.version != expected_version:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not authorized to access this task",
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Task was modified by another request",
             )
 
-        return task
+    async def _raise_for_missing(self, task_id: int, expected_version: int | None = None):
+        # the write matched nothing: find out whether the task is missing, foreign or changed
+        task = await self.get_task_by_id(task_id = task_id)
+        self._check_version(task, expected_version)
+        # it appeared/changed owner since the write; report it as gone
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
 
-    def update_task(self, task_id: int, title: str | None, description: str | None, status_value: str | None ):
-        
-        task = self.get_task_by_id(task_id = task_id)
+    def _write_criteria(self, task_id: int, expected_version: int | None) -> list:
+        criteria = [Task.id == task_id, Task.auth_user_id == self.current_user["auth_user_id"]]
+        if expected_version is not None:
+            criteria.append(Task.version == expected_version)
+        return criteria
 
+    async def update_task(
+        self,
+        task_id: int,
+        title: str | None,
+        description: str | None,
+        status_value: str | None,
+        expected_version: int | None = None,
+    ):
+        
+        values = {}
         if title is not None:
-            task.title = title
+            values["title"] = title
         if description is not None:
-            task.description = description
+            values["description"] = description
         if status_value is not None:
             if status_value not in self.valid_status:
                 raise ValueError("Invalid task status")
-            task.status = status_value
+            values["status"] = status_value
+
+        if not values:
+            task = await self.get_task_by_id(task_id = task_id)
+            self._check_version(task, expected_version)
+            return task
+
+        if status_value is None:
+            # ownership (and If-Match) check, write and read-back in one statement
+            task = await self.db.scalar(
+                update(Task)
+                .where(*self._write_criteria(task_id, expected_version))
+                .values(**values, version=Task.version + 1)
+                .returning(Task)
+            )
+            old_status = None
+        else:
+            # same, but the row is locked and its previous status read in the
+            # statement too, so the counters move by exactly this transition
+            previous = (
+                select(Task.id, Task.status)
+                .where(*self._write_criteria(task_id, expected_version))
+                .with_for_update()
+                .cte("previous")
+            )
+            row = (await self.db.execute(
+                update(Task)
+                .where(Task.id == previous.c.id, Task.auth_user_id == self.current_user["auth_user_id"])
+                .values(**values, version=Task.version + 1)
+                .returning(Task, previous.c.status)
+            )).one_or_none()
+            task, old_status = row if row is not None else (None, None)
+
+        if task is None:
+            await self.db.rollback()
+            await self._raise_for_missing(task_id, expected_version)
 
-        self.db.commit()
-        self.db.refresh(task)
+        deltas: dict[str, int] = {}
+        if status_value is not None:
+            self._count_transition(deltas, old_status, status_value)
+        await self._adjust_stats(deltas)
+
+        await self._commit([task_event("updated", task)])
         return task
 
-    def delete_task(self, task_id: int):
-        task = self.get_task_by_id(task_id = task_id)
-        self.db.delete(task)
-        self.db.commit()
\ No newline at end of file
+    async def delete_task(self, task_id: int, expected_version: int | None = None):
+        deleted = (await self.db.execute(
+            delete(Task)
+            .where(*self._write_criteria(task_id, expected_version))
+            .returning(Task.id, Task.status)
+        )).one_or_none()
+        if deleted is None:
+            await self.db.rollback()
+            await self._raise_for_missing(task_id, expected_version)
+
+        deltas: dict[str, int] = {}
+        self._count_transition(deltas, deleted.status, None)
+        await self._adjust_stats(deltas)
+        await self._commit([task_deleted_event(task_id)])
+
+    def _check_batch_size(self, size: int):
+        if size == 0:
+            raise ValueError("Batch is empty")
+        if size > settings.TASK_BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch exceeds {settings.TASK_BULK_MAX_ITEMS} items",
+            )
+
+    def lock_owned_statement(self, task_ids: list[int]):
+        # the user's own rows among `task_ids`, locked until commit
+        return (
+            select(Task.id, Task.auth_user_id, Task.version, Task.status)
+            .where(Task.id.in_(task_ids), Task.auth_user_id == self.current_user["auth_user_id"])
+            .with_for_update()
+        )
+
+    async def _lock_owned(self, task_ids: list[int]) -> dict[int, tuple[int, int, str | None]]:
+        # task id -> (owner, version, status) for the requested ids; the user's own
+        # rows are locked until commit, foreign ones are only looked up
+        result = await self.db.execute(self.lock_owned_statement(task_ids))
+        owners = {task_id: (owner, version, task_status) for task_id, owner, version, task_status in result.all()}
+
+        missing = set(task_ids) - owners.keys()
+        if missing:
+            # error path only: the lookup without the owner reads every partition
+            result = await self.db.execute(
+                select(Task.id, Task.auth_user_id, Task.version, Task.status).where(Task.id.in_(missing))
+            )
+            owners.update({task_id: (owner, version, task_status) for task_id, owner, version, task_status in result.all()})
+        return owners
+
+    async def _reject_foreign(self, owners: dict[int, tuple[int, int, str | None]]):
+        # a batch naming someone else's task is refused as a whole, before anything is written
+        if any(owner != self.current_user["auth_user_id"] for owner, _, _ in owners.values()):
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access one or more tasks",
+            )
+
+    def _ownership_result(self, task_id: int, owners: dict[int, tuple[int, int, str | None]], expected_version: int | None = None) -> dict | None:
+        if task_id not in owners:
+            return {"id": task_id, "result": "not_found", "detail": "Task not found"}
+        _, version, _ = owners[task_id]
+        if expected_version is not None and version != expected_version:
+            return {"id": task_id, "result": "conflict", "detail": "Task was modified by another request"}
+        return None
+
+    async def bulk_create_tasks(self, items: list[dict]) -> list[dict]:
+        '''
+        Insert every item with one multi-row INSERT ... RETURNING in one transaction.
+        '''
+        self._check_batch_size(len(items))
+        auth_user_id = self.current_user["auth_user_id"]
+
+        rows = [
+            {"title": item["title"], "description": item.get("description"), "auth_user_id": auth_user_id}
+            for item in items
+        ]
+        result = await self.db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), rows)
+        tasks = result.all()
+        await self._adjust_stats({"pending": len(tasks)})
+        await self._commit([task_event("created", task) for task in tasks])
+
+        return [{"id": task.id, "result": "created", "task": task} for task in tasks]
+
+    async def bulk_update_tasks(self, items: list[dict]) -> list[dict]:
+        '''
+        Apply partial updates in one transaction. Items that are invalid, missing
+        or stale are reported individually and skipped; any task owned by someone
+        else fails the whole batch with 403.
+        '''
+        self._check_batch_size(len(items))
+
+        owners = await self._lock_owned([item["id"] for item in items])
+        await self._reject_foreign(owners)
+
+        results: list[dict] = []
+        changes: list[dict] = []
+        deltas: dict[str, int] = {}
+        seen: set[int] = set()
+        for item in items:
+            task_id = item["id"]
+            failure = self._ownership_result(task_id, owners, item.get("version"))
+            if failure is None and task_id in seen:
+                failure = {"id": task_id, "result": "invalid", "detail": "Task appears more than once in the batch"}
+            if failure is None and item.get("status") is not None and item["status"] not in self.valid_status:
+                failure = {"id": task_id, "result": "invalid", "detail": "Invalid task status"}
+            if failure is not None:
+                results.append(failure)
+                continue
+
+            seen.add(task_id)
+            values = {key: item[key] for key in ("title", "description", "status") if item.get(key) is not None}
+            if values:
+                # rows are locked, so the version and status read above are still current
+                _, version, old_status = owners[task_id]
+                # bulk UPDATE by primary key needs the whole (id, auth_user_id) key
+                changes.append({"id": task_id, "auth_user_id": self.current_user["auth_user_id"], **values, "version": version + 1})
+                if "status" in values:
+                    self._count_transition(deltas, old_status, values["status"])
+            results.append({"id": task_id, "result": "updated"})
+
+        if changes:
+            # ORM bulk UPDATE by primary key: executemany per distinct column set
+            await self.db.execute(update(Task), changes)
+            await self._adjust_stats(deltas)
+
+        if seen:
+            updated = await self.db.scalars(
+                select(Task)
+                .where(Task.id.in_(seen), Task.auth_user_id == self.current_user["auth_user_id"])
+                .execution_options(populate_existing=True)
+            )
+            tasks = {task.id: task for task in updated}
+            for item_result in results:
+                if item_result["result"] == "updated":
+                    item_result["task"] = tasks[item_result["id"]]
+
+        await self._commit([
+            task_event("updated", item_result["task"]) for item_result in results if item_result["result"] == "updated"
+        ])
+        return results
+
+    async def bulk_delete_tasks(self, task_ids: list[int]) -> list[dict]:
+        '''
+        Delete the caller's tasks among `task_ids` with one DELETE in one transaction.
+        Missing ids are reported per item; any task owned by someone else fails
+        the whole batch with 403.
+        '''
+        self._check_batch_size(len(task_ids))
+        auth_user_id = self.current_user["auth_user_id"]
+
+        owners = await self._lock_owned(task_ids)
+        await self._reject_foreign(owners)
+
+        results: list[dict] = []
+        deltas: dict[str, int] = {}
+        owned: set[int] = set()
+        for task_id in task_ids:
+            failure = self._ownership_result(task_id, owners)
+            if failure is None and task_id in owned:
+                failure = {"id": task_id, "result": "invalid", "detail": "Task appears more than once in the batch"}
+            if failure is not None:
+                results.append(failure)
+                continue
+            owned.add(task_id)
+            self._count_transition(deltas, owners[task_id][2], None)
+            results.append({"id": task_id, "result": "deleted"})
+
+        if owned:
+            await self.db.execute(
+                delete(Task)
+                .where(Task.id.in_(owned), Task.auth_user_id == auth_user_id)
+                .execution_options(synchronize_session=False)
+            )
+            await self._adjust_stats(deltas)
+
+        await self._commit([task_deleted_event(task_id) for task_id in owned])
+        return results
+
+    async def purge_tasks_chunk(self, job: TaskPurgeJob, *, limit: int) -> int:
+        '''
+        Delete up to `limit` of the user's tasks covered by `job`, oldest first,
+        record the progress on the (locked) job row and commit both together.
+        One short transaction per chunk keeps row locks and WAL bounded however
+        many tasks the user has. Returns the number of tasks deleted.
+        '''
+        chunk = (
+            select(Task.id)
+            .where(Task.auth_user_id == job.auth_user_id, Task.created_at < job.purge_before)
+            .order_by(Task.created_at, Task.id)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        deleted = (await self.db.execute(
+            delete(Task)
+            .where(Task.id.in_(chunk), Task.auth_user_id == job.auth_user_id)
+            .returning(Task.id, Task.status)
+            .execution_options(synchronize_session=False)
+        )).all()
+
+        deltas: dict[str, int] = {}
+        for _, task_status in deleted:
+            self._count_transition(deltas, task_status, None)
+        await self._adjust_stats(deltas)
+
+        job.deleted_count += len(deleted)
+        if len(deleted) < limit:
+            job.completed_at = func.now()
+
+        await self._commit([task_deleted_event(task_id) for task_id, _ in deleted])
+        return len(deleted)
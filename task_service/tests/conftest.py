@@ -0,0 +1,116 @@
+'''
+Shared setup for the tests that run against a real PostgreSQL.
+
+    TEST_DATABASE_URL=postgresql://.../tasks_test python -m pytest tests
+
+TEST_DATABASE_URL must point at a disposable database migrated to head
+(`cd app && alembic -x database_url=$TEST_DATABASE_URL upgrade head`). Each
+test seeds its users inside a transaction, ANALYZEs, and rolls back, so the
+planner sees realistic partition sizes and nothing is left behind. Test
+modules skip themselves when the variable is not set.
+'''
+import asyncio
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # settings the app needs at import time; the database is the test one
+    os.environ.setdefault("APP_NAME", "task_service tests")
+    os.environ.setdefault("ENV", "test")
+    os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL)
+    os.environ.setdefault("AUTH_SERVICE_URL", "http://localhost:8001")
+    os.environ.setdefault("USER_SERVICE_URL", "http://localhost:8003")
+    # every test rolls back, so a cached listing from an earlier one would be stale
+    os.environ.setdefault("TASK_LIST_CACHE_ENABLED", "false")
+
+SEED_USERS = range(900_001, 900_301)
+TASKS_PER_USER = 100
+AUTH_USER_ID = SEED_USERS[0]
+OTHER_USER_ID = SEED_USERS[1]
+
+# one minute apart, newest first; every 10th pending, so the partial index
+# on pending tasks is clearly the cheapest way to list them
+SEED = """
+    INSERT INTO tasks (auth_user_id, title, status, created_at)
+    SELECT u, 'task ' || n,
+           CASE WHEN n % 10 = 0 THEN 'pending' ELSE 'completed' END,
+           now() - n * interval '1 minute'
+    FROM generate_series(CAST(:first_user AS integer), CAST(:last_user AS integer)) AS u,
+         generate_series(1, CAST(:per_user AS integer)) AS n
+"""
+
+
+async def _run_seeded(check):
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.core.database import build_engine
+
+    engine = build_engine(TEST_DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                await conn.execute(
+                    text(SEED),
+                    {"first_user": SEED_USERS[0], "last_user": SEED_USERS[-1], "per_user": TASKS_PER_USER},
+                )
+                await conn.execute(text("ANALYZE tasks"))
+                # the service's commits and rollbacks only touch a savepoint
+                async with AsyncSession(
+                    bind=conn,
+                    join_transaction_mode="create_savepoint",
+                    autoflush=False,
+                    expire_on_commit=False,
+                ) as db:
+                    await check(db)
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture
+def seeded():
+    '''
+    `seeded(check)` runs `await check(db)` on a session over freshly seeded
+    tasks; whatever the check writes is rolled back with the seed.
+    '''
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return lambda check: asyncio.run(_run_seeded(check))
+
+
+@pytest.fixture
+def api(seeded):
+    '''
+    `api(check)` runs `await check(client, db)`: `client` calls the app as the
+    first seeded user, and every route shares `db`, so it is rolled back too.
+    '''
+    import httpx
+
+    from app.dependencies.auth import get_current_user
+    from app.dependencies.db import get_db, get_read_db
+    from app.main import app
+
+    def run(check):
+        async def with_client(db):
+            async def session():
+                yield db
+
+            app.dependency_overrides[get_current_user] = lambda: {"auth_user_id": AUTH_USER_ID}
+            app.dependency_overrides[get_db] = session
+            app.dependency_overrides[get_read_db] = session
+            try:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    await check(client, db)
+            finally:
+                app.dependency_overrides.clear()
+
+        seeded(with_client)
+
+    return run
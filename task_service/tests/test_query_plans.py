@@ -0,0 +1,114 @@
+'''
+Plan checks for the per-user task queries against a real PostgreSQL, over the
+seeded users from conftest.py.
+'''
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import encode_cursor
+from app.core.query_plans import explain, partition_names, uses_index, has_seq_scan
+from app.models.task import Task
+from app.services.task_service import TaskService
+
+from conftest import AUTH_USER_ID, TASKS_PER_USER
+
+
+def run(seeded, check):
+    async def with_service(db):
+        # without these a bitmap scan plus sort can tie with the index scan on
+        # a small seed; the checks are about which index fits, not about costs
+        await db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        await db.execute(text("SET LOCAL enable_sort = off"))
+        await check(db, TaskService(db, {"auth_user_id": AUTH_USER_ID}))
+
+    seeded(with_service)
+
+
+async def by_id_indexes(db: AsyncSession) -> set[str]:
+    # the (id, auth_user_id) primary key or the plain id index, both fit
+    return await partition_names(db, "tasks_pkey") | await partition_names(db, "ix_tasks_id")
+
+
+async def assert_index_scan(db: AsyncSession, statement, index_name: str):
+    plan = await explain(db, statement)
+    assert uses_index(plan, await partition_names(db, index_name)), plan
+    assert not has_seq_scan(plan, await partition_names(db, "tasks")), plan
+
+
+def test_first_page_uses_user_created_at_index(seeded):
+    async def check(db, service):
+        for order in ("desc", "asc"):
+            await assert_index_scan(
+                db, service.list_statement(limit=50, order=order), "ix_tasks_auth_user_id_created_at_id"
+            )
+
+    run(seeded, check)
+
+
+def test_cursor_page_uses_user_created_at_index(seeded):
+    async def check(db, service):
+        boundary = datetime.now(timezone.utc) - timedelta(minutes=TASKS_PER_USER // 2)
+        for order in ("desc", "asc"):
+            cursor = encode_cursor(boundary, 1, order)
+            await assert_index_scan(
+                db,
+                service.list_statement(limit=50, cursor=cursor, order=order),
+                "ix_tasks_auth_user_id_created_at_id",
+            )
+
+    run(seeded, check)
+
+
+def test_created_range_uses_user_created_at_index(seeded):
+    async def check(db, service):
+        now = datetime.now(timezone.utc)
+        await assert_index_scan(
+            db,
+            service.list_statement(
+                limit=50,
+                created_after=now - timedelta(minutes=60),
+                created_before=now - timedelta(minutes=10),
+            ),
+            "ix_tasks_auth_user_id_created_at_id",
+        )
+
+    run(seeded, check)
+
+
+def test_pending_filter_uses_partial_index(seeded):
+    async def check(db, service):
+        await assert_index_scan(
+            db, service.list_statement(limit=50, status_value="pending"), "ix_tasks_auth_user_id_pending"
+        )
+
+    run(seeded, check)
+
+
+def test_bulk_ownership_check_uses_an_index(seeded):
+    async def check(db, service):
+        task_ids = list((await db.scalars(
+            select(Task.id).where(Task.auth_user_id == AUTH_USER_ID).limit(20)
+        )).all())
+        plan = await explain(db, service.lock_owned_statement(task_ids))
+        assert uses_index(plan, await by_id_indexes(db)), plan
+        assert not has_seq_scan(plan, await partition_names(db, "tasks")), plan
+
+    run(seeded, check)
+
+
+def test_single_task_write_criteria_use_an_index(seeded):
+    async def check(db, service):
+        task_id = await db.scalar(select(Task.id).where(Task.auth_user_id == AUTH_USER_ID).limit(1))
+        plan = await explain(db, select(Task.id).where(*service._write_criteria(task_id, expected_version=1)))
+        assert uses_index(plan, await by_id_indexes(db)), plan
+        assert not has_seq_scan(plan, await partition_names(db, "tasks")), plan
+
+    run(seeded, check)
@@ -0,0 +1,132 @@
+'''
+The bulk task endpoints against a real PostgreSQL, over the seeded users from
+conftest.py.
+'''
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.task import Task
+
+from conftest import AUTH_USER_ID, OTHER_USER_ID
+
+
+async def task_ids(db, auth_user_id: int, count: int) -> list[int]:
+    return list((await db.scalars(
+        select(Task.id).where(Task.auth_user_id == auth_user_id).order_by(Task.id).limit(count)
+    )).all())
+
+
+async def unused_id(db) -> int:
+    return await db.scalar(select(func.max(Task.id))) + 1000
+
+
+async def task_rows(db, ids: list[int]) -> dict[int, tuple]:
+    result = await db.execute(select(Task.id, Task.title, Task.status, Task.version).where(Task.id.in_(ids)))
+    return {task_id: (title, task_status, version) for task_id, title, task_status, version in result.all()}
+
+
+def results_by_id(response) -> dict[int, dict]:
+    return {item["id"]: item for item in response.json()["data"]["results"]}
+
+
+def test_bulk_create(api):
+    async def check(client, db):
+        response = await client.post("/tasks/bulk", json={"tasks": [{"title": f"bulk {n}"} for n in range(3)]})
+
+        assert response.status_code == 201, response.text
+        results = response.json()["data"]["results"]
+        assert [item["result"] for item in results] == ["created"] * 3
+        assert [item["task"]["title"] for item in results] == ["bulk 0", "bulk 1", "bulk 2"]
+        rows = await task_rows(db, [item["id"] for item in results])
+        assert sorted(title for title, _, _ in rows.values()) == ["bulk 0", "bulk 1", "bulk 2"]
+
+    api(check)
+
+
+def test_bulk_create_over_the_limit_is_rejected(api):
+    async def check(client, db):
+        too_many = [{"title": "bulk"}] * (settings.TASK_BULK_MAX_ITEMS + 1)
+
+        response = await client.post("/tasks/bulk", json={"tasks": too_many})
+
+        assert response.status_code == 413, response.text
+        assert await db.scalar(select(func.count()).select_from(Task).where(Task.title == "bulk")) == 0
+
+    api(check)
+
+
+def test_bulk_update(api):
+    async def check(client, db):
+        done, stale = await task_ids(db, AUTH_USER_ID, 2)
+        missing = await unused_id(db)
+
+        response = await client.patch("/tasks/bulk", json={"tasks": [
+            {"id": done, "status": "completed", "title": "done"},
+            {"id": stale, "title": "stale", "version": 99},
+            {"id": missing, "title": "missing"},
+        ]})
+
+        assert response.status_code == 200, response.text
+        results = results_by_id(response)
+        assert results[done]["result"] == "updated"
+        assert results[done]["task"]["version"] == 2
+        assert results[stale]["result"] == "conflict"
+        assert results[missing]["result"] == "not_found"
+        rows = await task_rows(db, [done, stale])
+        assert rows[done] == ("done", "completed", 2)
+        assert rows[stale][0] != "stale"
+
+    api(check)
+
+
+def test_bulk_delete(api):
+    async def check(client, db):
+        owned = await task_ids(db, AUTH_USER_ID, 2)
+        missing = await unused_id(db)
+
+        response = await client.request("DELETE", "/tasks/bulk", json={"ids": [*owned, missing]})
+
+        assert response.status_code == 200, response.text
+        results = results_by_id(response)
+        assert [results[task_id]["result"] for task_id in owned] == ["deleted", "deleted"]
+        assert results[missing]["result"] == "not_found"
+        assert await task_rows(db, owned) == {}
+
+    api(check)
+
+
+def test_bulk_update_with_another_users_task_is_forbidden_as_a_whole(api):
+    async def check(client, db):
+        [own] = await task_ids(db, AUTH_USER_ID, 1)
+        [foreign] = await task_ids(db, OTHER_USER_ID, 1)
+        before = await task_rows(db, [own, foreign])
+
+        response = await client.patch("/tasks/bulk", json={"tasks": [
+            {"id": own, "title": "mine"},
+            {"id": foreign, "title": "theirs"},
+        ]})
+
+        assert response.status_code == 403, response.text
+        assert await task_rows(db, [own, foreign]) == before
+
+    api(check)
+
+
+def test_bulk_delete_with_another_users_task_is_forbidden_as_a_whole(api):
+    async def check(client, db):
+        [own] = await task_ids(db, AUTH_USER_ID, 1)
+        [foreign] = await task_ids(db, OTHER_USER_ID, 1)
+
+        response = await client.request("DELETE", "/tasks/bulk", json={"ids": [own, foreign]})
+
+        assert response.status_code == 403, response.text
+        assert (await task_rows(db, [own, foreign])).keys() == {own, foreign}
+
+    api(check)
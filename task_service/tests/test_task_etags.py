@@ -0,0 +1,81 @@
+'''
+ETags, conditional GETs and If-Match writes against a real PostgreSQL, over
+the seeded users from conftest.py.
+'''
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import select
+
+from app.core.etags import task_etag
+from app.models.task import Task
+
+from conftest import AUTH_USER_ID
+
+
+async def own_task_id(db) -> int:
+    return await db.scalar(select(Task.id).where(Task.auth_user_id == AUTH_USER_ID).order_by(Task.id).limit(1))
+
+
+def test_task_detail_answers_a_matching_if_none_match_with_304(api):
+    async def check(client, db):
+        task_id = await own_task_id(db)
+
+        response = await client.get(f"/tasks/{task_id}")
+        assert response.status_code == 200, response.text
+        etag = response.headers["ETag"]
+        assert etag == task_etag(task_id, 1)
+
+        response = await client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    api(check)
+
+
+def test_writes_with_a_stale_if_match_fail_with_412(api):
+    async def check(client, db):
+        task_id = await own_task_id(db)
+        stale = task_etag(task_id, 1)
+
+        response = await client.put(f"/tasks/{task_id}", json={"title": "first"}, headers={"If-Match": stale})
+        assert response.status_code == 200, response.text
+        assert response.headers["ETag"] == task_etag(task_id, 2)
+
+        response = await client.put(f"/tasks/{task_id}", json={"title": "second"}, headers={"If-Match": stale})
+        assert response.status_code == 412, response.text
+
+        response = await client.delete(f"/tasks/{task_id}", headers={"If-Match": stale})
+        assert response.status_code == 412, response.text
+
+        assert (await db.execute(
+            select(Task.title, Task.version).where(Task.id == task_id, Task.auth_user_id == AUTH_USER_ID)
+        )).one() == ("first", 2)
+
+    api(check)
+
+
+def test_task_list_etag_changes_after_a_write(api):
+    async def check(client, db):
+        response = await client.get("/tasks")
+        assert response.status_code == 200, response.text
+        etag = response.headers["ETag"]
+
+        response = await client.get("/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = await client.post("/tasks", json={"title": "new"})
+        assert response.status_code == 201, response.text
+
+        response = await client.get("/tasks", headers={"If-None-Match": etag})
+        assert response.status_code == 200, response.text
+        assert response.headers["ETag"] != etag
+        assert response.json()["data"]["items"][0]["title"] == "new"
+
+    api(check)
@@ -0,0 +1,50 @@
+'''
+TaskService writes against a real PostgreSQL, over the seeded users from
+conftest.py.
+'''
+import os
+
+import pytest
+
+if not os.environ.get("TEST_DATABASE_URL"):
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+from sqlalchemy import func, select
+
+from app.models.task import Task
+from app.services.task_service import TaskService
+
+from conftest import AUTH_USER_ID
+
+
+def test_create_task_gets_an_id_from_the_sequence(seeded):
+    async def check(db):
+        service = TaskService(db, {"auth_user_id": AUTH_USER_ID})
+        highest = await db.scalar(select(func.max(Task.id)))
+
+        first = await service.create_task(title="first", description=None)
+        second = await service.create_task(title="second", description="two")
+
+        assert highest < first.id < second.id
+        assert (first.auth_user_id, first.status, first.version) == (AUTH_USER_ID, "pending", 1)
+        assert await db.get(Task, (second.id, AUTH_USER_ID)) is second
+
+    seeded(check)
+
+
+def test_bulk_create_tasks_gets_ids_in_request_order(seeded):
+    async def check(db):
+        service = TaskService(db, {"auth_user_id": AUTH_USER_ID})
+        highest = await db.scalar(select(func.max(Task.id)))
+
+        results = await service.bulk_create_tasks([{"title": f"bulk {n}"} for n in range(3)])
+
+        ids = [item["id"] for item in results]
+        assert [item["result"] for item in results] == ["created"] * 3
+        assert [item["task"].title for item in results] == ["bulk 0", "bulk 1", "bulk 2"]
+        assert highest < ids[0] and ids == sorted(set(ids))
+        assert await db.scalar(
+            select(func.count()).select_from(Task).where(Task.id.in_(ids), Task.auth_user_id == AUTH_USER_ID)
+        ) == 3
+
+    seeded(check)
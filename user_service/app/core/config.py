@@ -9,8 +9,63 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str
 
+    # optional read replicas of DATABASE_URL (JSON list in the env)
+    DATABASE_REPLICA_URLS: list[str] = []
+    # replicas further behind than this are skipped (reads fall back to the primary)
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_SECONDS: float = 2.0
+    # redis key prefix of each user's last write position (read-your-writes)
+    READ_YOUR_WRITES_KEY_PREFIX: str = "users:rw"
+
     AUTH_SERVICE_URL: str
 
+    # transactional outbox relayed to a redis stream (consumed by task_service)
+    USER_EVENTS_STREAM: str = "users:events"
+    USER_EVENTS_STREAM_MAXLEN: int = 100000
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 100
+
+    # redis (REDIS_UNIX_SOCKET_PATH takes precedence over host/port)
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str | None = None
+    REDIS_UNIX_SOCKET_PATH: str | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 0.5
+    REDIS_SOCKET_KEEPALIVE: bool = True
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    # offline token verification against the auth service JWKS (unset = disabled)
+    JWKS_URL: str | None = None
+    # each token is verified with its JWK's own `alg`, which must be one of these
+    JWKS_ALLOWED_ALGORITHMS: list[str] = ["RS256", "ES256"]
+    JWKS_REFRESH_SECONDS: int = 300
+    JWKS_MIN_REFRESH_SECONDS: int = 30
+
+    # identity header signed by the API gateway (unset = always validate tokens)
+    INTERNAL_IDENTITY_SECRET: str | None = None
+    INTERNAL_IDENTITY_HEADER: str = "X-Internal-Identity"
+
+    # also read `auth:token:<jwt>` JSON entries written before digest keys
+    TOKEN_CACHE_READ_LEGACY_KEYS: bool = True
+
+    # in-process token cache in front of Redis
+    TOKEN_L1_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_L1_CACHE_TTL_SECONDS: int = 60
+    TOKEN_INVALIDATION_CHANNEL: str = "auth:token:invalidate"
+    # logged-out, not yet expired tokens remembered per worker
+    TOKEN_REVOCATION_MAX_ENTRIES: int = 100000
+
+    # negative cache for tokens the auth service rejected
+    TOKEN_NEGATIVE_CACHE_MAX_ENTRIES: int = 10000
+    TOKEN_NEGATIVE_CACHE_TTL_SECONDS: int = 60
+
+    # single-flight validation: cross-worker lock lifetime and cache poll interval
+    TOKEN_VALIDATION_LOCK_MS: int = 3000
+    TOKEN_VALIDATION_POLL_MS: int = 25
+
     class Config:
         env_file = BASE_DIR / ".env"
 
@@ -1,14 +1,44 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, echo = False)
+# asyncio driver used for each backend when DATABASE_URL names a sync one
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-)
+
+def async_database_url(url: str) -> str:
+    '''
+    `postgresql://...` / `postgresql+psycopg2://...` -> `postgresql+asyncpg://...`
+    so the same DATABASE_URL serves Alembic (sync) and the app (asyncio).
+    '''
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS and parsed.get_driver_name() != ASYNC_DRIVERS[backend]:
+        parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return parsed.render_as_string(hide_password=False)
+
+
+def build_engine(url: str):
+    return create_async_engine(async_database_url(url), pool_pre_ping=True, echo = False)
+
+
+def build_sessionmaker(bind) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        # attributes stay readable after commit without an implicit (sync) reload
+        expire_on_commit=False,
+    )
+
+
+engine = build_engine(settings.DATABASE_URL)
+
+SessionLocal = build_sessionmaker(engine)
 
 Base = declarative_base()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import logging
+
+from redis.exceptions import ConnectionError, TimeoutError
+from sqlalchemy import select, delete
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.redis import redis_client
+from app.models.outbox_event import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+
+def stream_fields(event: OutboxEvent) -> dict:
+    return {
+        # outbox id doubles as an idempotency key for consumers
+        "event_id": str(event.id),
+        "type": event.event_type,
+        "auth_user_id": str(event.auth_user_id),
+        "occurred_at": event.created_at.isoformat(),
+        "payload": json.dumps(event.payload),
+    }
+
+
+class OutboxRelay:
+    '''
+    Background task that moves committed outbox rows to the redis stream.
+    Rows are claimed with SKIP LOCKED, so every worker can run a relay, and
+    deleted only after XADD succeeded: a crash in between re-sends them, which
+    consumers must (and do) tolerate.
+    '''
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+
+    async def relay_once(self) -> int:
+        async with SessionLocal() as db:
+            events = (await db.scalars(
+                select(OutboxEvent)
+                .order_by(OutboxEvent.id)
+                .limit(settings.OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )).all()
+            if not events:
+                return 0
+
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for event in events:
+                    pipe.xadd(
+                        settings.USER_EVENTS_STREAM,
+                        stream_fields(event),
+                        maxlen=settings.USER_EVENTS_STREAM_MAXLEN,
+                        approximate=True,
+                    )
+                await pipe.execute()
+
+            await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([event.id for event in events])))
+            await db.commit()
+            return len(events)
+
+    async def _run(self):
+        while True:
+            try:
+                relayed = await self.relay_once()
+            except REDIS_ERRORS + (SQLAlchemyError, OSError):
+                logger.warning("Outbox relay failed; retrying", exc_info=True)
+                relayed = 0
+            # keep draining while there is a backlog, otherwise poll
+            if relayed < settings.OUTBOX_BATCH_SIZE:
+                await asyncio.sleep(settings.OUTBOX_POLL_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+outbox_relay = OutboxRelay()
@@ -1,3 +1,42 @@
 import redis.asyncio as redis
 
-redis_client = redis.Redis(host="localhost",port=6379,decode_responses=True)
\ No newline at end of file
+from app.core.config import settings
+
+
+def _build_pool(*, socket_timeout: float | None, max_connections: int) -> redis.ConnectionPool:
+    common = dict(
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+        max_connections=max_connections,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        # values are compact binary (see token cache encoding), not text
+        decode_responses=False,
+    )
+    if settings.REDIS_UNIX_SOCKET_PATH:
+        return redis.ConnectionPool(
+            connection_class=redis.UnixDomainSocketConnection,
+            path=settings.REDIS_UNIX_SOCKET_PATH,
+            **common,
+        )
+    return redis.ConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        socket_keepalive=settings.REDIS_SOCKET_KEEPALIVE,
+        **common,
+    )
+
+
+redis_client = redis.Redis(
+    connection_pool=_build_pool(
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+    )
+)
+
+# pub/sub connections block on reads indefinitely, so they get their own
+# small pool without a socket read timeout
+redis_pubsub_client = redis.Redis(
+    connection_pool=_build_pool(socket_timeout=None, max_connections=4)
+)
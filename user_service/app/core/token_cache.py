@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import time
+
+from jose import jwt, JWTError
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.identity import token_fingerprint
+from app.core.redis import redis_client, redis_pubsub_client
+
+logger = logging.getLogger(__name__)
+
+# written by auth_service on logout: token fingerprint -> `exp`
+REVOKED_TOKENS_KEY = "auth:token:revoked"
+
+# validated users keyed by token fingerprint, per worker
+local_token_cache = TTLCache(
+    max_entries=settings.TOKEN_L1_CACHE_MAX_ENTRIES,
+    default_ttl=settings.TOKEN_L1_CACHE_TTL_SECONDS,
+)
+
+# tokens known to be invalid; they never become valid again, so no
+# invalidation is needed and this cache is always on
+local_invalid_tokens = TTLCache(
+    max_entries=settings.TOKEN_NEGATIVE_CACHE_MAX_ENTRIES,
+    default_ttl=settings.TOKEN_NEGATIVE_CACHE_TTL_SECONDS,
+)
+
+# logged-out tokens until they expire; filled from REVOKED_TOKENS_KEY on every
+# (re)subscribe and kept current by invalidation messages
+revoked_tokens = TTLCache(
+    max_entries=settings.TOKEN_REVOCATION_MAX_ENTRIES,
+    default_ttl=float("inf"),
+)
+
+
+def invalid_token_cache_key(token: str) -> str:
+    return f"auth:token:invalid:{token_fingerprint(token)}"
+
+
+def token_expiry(token: str) -> int | None:
+    # unverified read of `exp`; only used to bound cache lifetimes
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        return int(exp) if exp is not None else None
+    except (JWTError, TypeError, ValueError):
+        return None
+
+
+def get_local_user(token: str) -> dict | None:
+    if not token_invalidation_listener.subscribed:
+        return None
+    return local_token_cache.get(token_fingerprint(token))
+
+
+def set_local_user(token: str, user_data: dict):
+    if not token_invalidation_listener.subscribed:
+        return
+    exp = token_expiry(token)
+    if exp is None or revoked_tokens.get(token_fingerprint(token)) is not None:
+        return
+    # never outlive the token itself
+    local_token_cache.set(token_fingerprint(token), user_data, ttl=exp - time.time())
+
+
+def is_locally_invalid(token: str) -> bool:
+    fingerprint = token_fingerprint(token)
+    return local_invalid_tokens.get(fingerprint) is not None or revoked_tokens.get(fingerprint) is not None
+
+
+def set_locally_invalid(token: str):
+    local_invalid_tokens.set(token_fingerprint(token), True)
+
+
+def apply_invalidation(message: dict):
+    fingerprint = message.get("token")
+    if not fingerprint:
+        return
+    local_token_cache.delete(fingerprint)
+
+    revoked_until = message.get("revoked_until")
+    if revoked_until is not None:
+        revoked_tokens.set(fingerprint, True, ttl=float(revoked_until) - time.time())
+
+
+async def load_revoked_tokens():
+    now = time.time()
+    for fingerprint, exp in await redis_client.zrangebyscore(REVOKED_TOKENS_KEY, now, "+inf", withscores=True):
+        revoked_tokens.set(fingerprint.decode(), True, ttl=exp - now)
+
+
+class TokenInvalidationListener:
+    '''
+    One pub/sub subscription per worker that applies auth_service's logout
+    messages to the local caches. The local cache is only used while
+    subscribed; anything cached before a disconnect may have missed a message,
+    so it is dropped and the revocation list reloaded.
+    '''
+
+    def __init__(self):
+        self.subscribed = False
+        self._task: asyncio.Task | None = None
+
+    async def _listen(self):
+        backoff = 1
+        while True:
+            pubsub = redis_pubsub_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.TOKEN_INVALIDATION_CHANNEL)
+                local_token_cache.clear()
+                # after subscribing, so a logout in between is not missed
+                await load_revoked_tokens()
+                self.subscribed = True
+                backoff = 1
+
+                async for message in pubsub.listen():
+                    try:
+                        apply_invalidation(json.loads(message["data"]))
+                    except (ValueError, TypeError, AttributeError):
+                        logger.warning("Ignoring malformed token invalidation message: %r", message)
+            except (ConnectionError, ConnectionRefusedError, TimeoutError, OSError):
+                # without invalidations the local cache can not be trusted
+                self.subscribed = False
+                local_token_cache.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                self.subscribed = False
+                await pubsub.aclose()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+token_invalidation_listener = TokenInvalidationListener()
@@ -0,0 +1,174 @@
+import asyncio
+import time
+import uuid
+
+import httpx
+from fastapi import HTTPException, status
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.config import settings
+from app.core.identity import token_fingerprint
+from app.core.redis import redis_client
+from app.core.token_cache import (
+    invalid_token_cache_key,
+    token_expiry,
+    set_locally_invalid,
+)
+from app.core.token_codec import (
+    token_cache_key,
+    legacy_token_cache_key,
+    encode_cached_user,
+    decode_cached_user,
+)
+
+# validations currently running in this worker, keyed by token fingerprint
+_inflight: dict[str, asyncio.Task] = {}
+
+# delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+REDIS_ERRORS = (ConnectionError, ConnectionRefusedError, TimeoutError)
+
+
+async def read_cached_user(token: str) -> dict | None:
+    '''
+    Look the token up in the shared cache, positive and negative entries in one
+    round trip. Raises 401 for a token the auth service already rejected.
+    Entries written under the old raw-token key (JSON) are still honoured.
+    '''
+    keys = [token_cache_key(token), invalid_token_cache_key(token)]
+    if settings.TOKEN_CACHE_READ_LEGACY_KEYS:
+        keys.append(legacy_token_cache_key(token))
+
+    try:
+        cached_user, invalid, *legacy = await redis_client.mget(keys)
+    except REDIS_ERRORS:
+        # Fallback to the Auth Service if Redis is down
+        return None
+
+    if invalid:
+        set_locally_invalid(token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    cached_user = cached_user or (legacy[0] if legacy else None)
+    if not cached_user:
+        return None
+
+    try:
+        return decode_cached_user(cached_user)
+    except (ValueError, TypeError):
+        # unreadable entry, treat as a miss and let it be rewritten
+        return None
+
+
+async def write_cached_user(token: str, user_data: dict, expires_in: int):
+    exp = token_expiry(token)
+    if exp is not None:
+        expires_in = min(expires_in, int(exp - time.time()))
+    if expires_in <= 0:
+        return
+    try:
+        await redis_client.set(token_cache_key(token), encode_cached_user(user_data), ex=expires_in)
+    except REDIS_ERRORS:
+        pass
+
+
+async def write_invalid_token(token: str):
+    set_locally_invalid(token)
+    try:
+        await redis_client.set(invalid_token_cache_key(token), "1", ex=settings.TOKEN_NEGATIVE_CACHE_TTL_SECONDS)
+    except REDIS_ERRORS:
+        pass
+
+
+async def call_auth_service(token: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        try:
+            response = await client.post(
+                f"{settings.AUTH_SERVICE_URL}/auth/validate-token",
+                json={"token": token},
+                timeout=5
+            )
+        except httpx.RequestError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Auth service unavailable"
+            )
+
+    if response.status_code != 200:
+        # only a definite rejection is cached, not auth service errors
+        if 400 <= response.status_code < 500:
+            await write_invalid_token(token)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+    body = response.json()
+    user_data = body["data"]
+
+    # cached user data
+    await write_cached_user(token, user_data, body.get("expires_in", 900))
+    return user_data
+
+
+async def _wait_for_other_worker(token: str) -> dict | None:
+    # poll the shared cache while another worker holds the validation lock
+    deadline = time.monotonic() + settings.TOKEN_VALIDATION_LOCK_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(settings.TOKEN_VALIDATION_POLL_MS / 1000)
+        cached_user = await read_cached_user(token)
+        if cached_user is not None:
+            return cached_user
+    return None
+
+
+async def _validate_across_workers(token: str) -> dict:
+    lock_key = f"auth:token:lock:{token_fingerprint(token)}"
+    lock_value = uuid.uuid4().hex
+
+    try:
+        acquired = await redis_client.set(lock_key, lock_value, nx=True, px=settings.TOKEN_VALIDATION_LOCK_MS)
+    except REDIS_ERRORS:
+        # no coordination without redis, validate directly
+        return await call_auth_service(token)
+
+    if not acquired:
+        cached_user = await _wait_for_other_worker(token)
+        if cached_user is not None:
+            return cached_user
+        # the lock holder gave up or the token is invalid; find out ourselves
+        return await call_auth_service(token)
+
+    try:
+        return await call_auth_service(token)
+    finally:
+        try:
+            await redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, lock_value)
+        except REDIS_ERRORS:
+            pass
+
+
+async def validate_token_coalesced(token: str) -> dict:
+    '''
+    Validate `token` with the auth service, making sure only one validation per
+    token is in flight in this worker (concurrent callers share its result) and,
+    through a short Redis lock, across workers (the others wait for the cache).
+    '''
+    key = token_fingerprint(token)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_validate_across_workers(token))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # a cancelled caller must not cancel the validation the others wait on
+    return await asyncio.shield(task)
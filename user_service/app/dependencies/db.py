@@ -1,8 +1,15 @@
-from app.core.database import SessionLocal
+from fastapi import Depends
 
-def get_db():
-    db = SessionLocal()
-    try:
+from app.core.replicas import read_replicas
+from app.dependencies.auth import get_current_user
+
+async def get_db():
+    # primary; tagged so writes can record their WAL position for later reads
+    async with read_replicas.write_session() as db:
+        yield db
+
+
+async def get_read_db(current_user: dict = Depends(get_current_user)):
+    # GET routes only: may be a replica, never one behind the caller's own writes
+    async with await read_replicas.read_session(current_user["auth_user_id"]) as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
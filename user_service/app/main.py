@@ -1,11 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.exceptions import RequestValidationError
 
 from app.core.responses import error_response
 from app.core.config import settings
+from app.core.jwks import jwks_cache
+from app.core.token_cache import token_invalidation_listener
+from app.core.outbox import outbox_relay
+from app.core.replicas import read_replicas
 from app.routers import user
 
-app = FastAPI(title=settings.APP_NAME)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await jwks_cache.start()
+    read_replicas.start()
+    token_invalidation_listener.start()
+    outbox_relay.start()
+    try:
+        yield
+    finally:
+        await outbox_relay.stop()
+        await token_invalidation_listener.stop()
+        await jwks_cache.stop()
+        await read_replicas.stop()
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 app.include_router(user.router)
 
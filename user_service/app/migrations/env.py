@@ -17,6 +17,7 @@ from sqlalchemy import pool
 from alembic import context
 from app.core.database import Base
 from app.models.user_profile import UserProfile
+from app.models.outbox_event import OutboxEvent
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class OutboxEvent(Base):
+    '''
+    Events written in the same transaction as the change they describe. The
+    relay moves them to the `USER_EVENTS_STREAM` redis stream (at least once)
+    and deletes them, so the table only holds what is still undelivered.
+    '''
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    event_type = Column(String, nullable=False)
+    auth_user_id = Column(Integer, nullable=False)
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,21 +1,24 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.core.replicas import record_write
 from app.models.user_profile import UserProfile
+from app.models.outbox_event import OutboxEvent
 
 
 class UserProfileService:
     
-    def __init__(self, db:Session, current_user: dict):
+    def __init__(self, db:AsyncSession, current_user: dict):
         self.db = db
         self.current_user = current_user
         self.auth_user_id = self.current_user["auth_user_id"]
     
-    def get_user_profile(self) -> UserProfile:
+    async def get_user_profile(self) -> UserProfile:
         
-        profile = self.db.query(UserProfile).filter(
+        profile = await self.db.scalar(select(UserProfile).where(
             UserProfile.auth_user_id == self.auth_user_id
-        ).first()
+        ))
 
         if not profile:
             raise HTTPException(
@@ -25,11 +28,11 @@ class UserProfileService:
 
         return profile
 
-    def create_user_profile(self, profile_name: str) -> UserProfile:
+    async def create_user_profile(self, profile_name: str) -> UserProfile:
         
-        existing_profile = self.db.query(UserProfile).filter(
+        existing_profile = await self.db.scalar(select(UserProfile).where(
             UserProfile.auth_user_id == self.auth_user_id
-        ).first()
+        ))
         
         if existing_profile:
             raise HTTPException(
@@ -40,15 +43,16 @@ class UserProfileService:
         user_profile = UserProfile(auth_user_id = self.auth_user_id, full_name = profile_name)
         
         self.db.add(user_profile)
-        self.db.commit()
-        self.db.refresh(user_profile)
+        await self.db.commit()
+        await record_write(self.db, self.auth_user_id)
+        await self.db.refresh(user_profile)
         return user_profile
 
-    def update_user_profile(self, profile_name: str) -> UserProfile:
+    async def update_user_profile(self, profile_name: str) -> UserProfile:
         
-        profile = self.db.query(UserProfile).filter(
+        profile = await self.db.scalar(select(UserProfile).where(
             UserProfile.auth_user_id == self.auth_user_id
-        ).first()
+        ))
 
         if not profile:
             raise HTTPException(
@@ -58,15 +62,16 @@ class UserProfileService:
         
         profile.full_name = profile_name
         
-        self.db.commit()
-        self.db.refresh(profile)
+        await self.db.commit()
+        await record_write(self.db, self.auth_user_id)
+        await self.db.refresh(profile)
         return profile
 
-    def delete_user_profile(self):
+    async def delete_user_profile(self):
         
-        profile = self.db.query(UserProfile).filter(
+        profile = await self.db.scalar(select(UserProfile).where(
             UserProfile.auth_user_id == self.auth_user_id
-        ).first()
+        ))
 
         if not profile:
             raise HTTPException(
@@ -74,7 +79,14 @@ class UserProfileService:
                 detail="User profile not found"
             )
 
-        self.db.delete(profile)
-        self.db.commit()
+        await self.db.delete(profile)
+        # committed atomically with the delete; task_service purges the user's tasks
+        self.db.add(OutboxEvent(
+            event_type = "user.profile_deleted",
+            auth_user_id = self.auth_user_id,
+            payload = {"profile_id": profile.id},
+        ))
+        await self.db.commit()
+        await record_write(self.db, self.auth_user_id)
         
         return
\ No newline at end of file